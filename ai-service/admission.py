@@ -0,0 +1,105 @@
+import asyncio
+import functools
+
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+class AdmissionGate:
+    """
+    Bounded in-flight budget for one endpoint with a short wait queue.
+    Requests beyond the budget wait up to queue_timeout seconds for a slot;
+    once the queue is full they are refused immediately (429), and requests
+    that time out in the queue are refused with 503.
+    """
+
+    def __init__(self, name, max_in_flight, max_queue, queue_timeout, retry_after):
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.semaphore = asyncio.Semaphore(max_in_flight)
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+
+    async def acquire(self):
+        """Return None once admitted, or the HTTP status to refuse the request with."""
+        if self.semaphore.locked():
+            if self.waiting >= self.max_queue:
+                self.rejected_queue_full += 1
+                return 429
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self.semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.rejected_timeout += 1
+                return 503
+            finally:
+                self.waiting -= 1
+        else:
+            await self.semaphore.acquire()
+        self.in_flight += 1
+        self.admitted += 1
+        return None
+
+    def release(self):
+        self.in_flight -= 1
+        self.semaphore.release()
+
+    async def release_after(self, body_iterator):
+        """Hold the slot until a streamed body has been fully sent."""
+        try:
+            async for chunk in body_iterator:
+                yield chunk
+        finally:
+            self.release()
+
+    def stats(self):
+        return {
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+        }
+
+
+def overloaded_response(gate, status_code, content=None):
+    return JSONResponse(
+        status_code=status_code,
+        content=content or {"error": f"Service busy, please retry in {gate.retry_after} seconds"},
+        headers={"Retry-After": str(gate.retry_after)},
+    )
+
+
+def admission_controlled(gate, on_reject=None):
+    """
+    Run an endpoint inside gate's budget.
+    on_reject(*args, **kwargs) may answer a refused request instead of the
+    default 429/503 with Retry-After, e.g. with a degraded 200.
+    """
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(*args, **kwargs):
+            status_code = await gate.acquire()
+            if status_code is not None:
+                if on_reject is not None:
+                    return on_reject(*args, **kwargs)
+                return overloaded_response(gate, status_code)
+            try:
+                response = await handler(*args, **kwargs)
+            except BaseException:
+                gate.release()
+                raise
+            if isinstance(response, StreamingResponse):
+                response.body_iterator = gate.release_after(response.body_iterator)
+            else:
+                gate.release()
+            return response
+        return wrapper
+    return decorator
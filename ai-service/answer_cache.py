@@ -0,0 +1,112 @@
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+
+from retrieval import fold_text
+
+PUNCTUATION_RE = re.compile(r"[^\w\s]")
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_question(text):
+    """Fold case, diacritics, punctuation and whitespace: 'Wetin be  Postinor?' -> 'wetin be postinor'."""
+    text = PUNCTUATION_RE.sub(" ", fold_text(text))
+    return WHITESPACE_RE.sub(" ", text).strip()
+
+
+class AnswerCache:
+    """
+    Bounded LRU cache of answers with a per-entry TTL.
+    Expiry times are wall-clock so a snapshot written by one worker is
+    still meaningful when another process loads it after a restart.
+    """
+
+    def __init__(self, max_size=5000, ttl=86400):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(question, language, prompt_version):
+        return f"{prompt_version}|{language}|{normalize_question(question)}"
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expires_at = entry
+        if expires_at <= time.time():
+            del self.entries[key]
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self.entries[key] = (value, time.time() + self.ttl)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self.entries)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def save(self, path):
+        """
+        Write live entries to path atomically (least recently used first).
+        Live entries already in the file and not in memory are kept ahead of
+        ours, so workers sharing one snapshot do not erase each other's.
+        """
+        now = time.time()
+        entries = []
+        try:
+            with open(path, encoding="utf-8") as f:
+                entries = [entry for entry in json.load(f)
+                           if entry[2] > now and entry[0] not in self.entries]
+        except (OSError, ValueError):
+            pass
+        entries += [[key, value, expires_at]
+                    for key, (value, expires_at) in self.entries.items()
+                    if expires_at > now]
+        entries = entries[-self.max_size:]
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Per process, several workers may snapshot at once
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return len(entries)
+
+    def load(self, path):
+        """Load a snapshot written by save(), skipping expired entries."""
+        with open(path, encoding="utf-8") as f:
+            entries = json.load(f)
+        now = time.time()
+        for key, value, expires_at in entries:
+            if expires_at > now:
+                self.entries[key] = (value, expires_at)
+                self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+        return len(self.entries)
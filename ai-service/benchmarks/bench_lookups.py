@@ -0,0 +1,185 @@
+"""
+Microbenchmarks for the lookup endpoints on synthetic data.
+
+Calls predict_lga, refer_to_clinic, get_town_from_lga,
+get_town_from_lga_messenger and typeahead in-process (no HTTP) against generated
+datasets at 1x, 10x and 100x today's size, and reports per-call latency
+and allocation peak per handler. Compare with, or refresh, the
+committed baseline:
+
+    python benchmarks/bench_lookups.py                     # run and compare
+    python benchmarks/bench_lookups.py --check             # exit 1 on regression
+    python benchmarks/bench_lookups.py --update-baseline   # write baseline.json
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVICE_DIR = os.path.dirname(BENCH_DIR)
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+
+sys.path.insert(0, SERVICE_DIR)
+sys.path.insert(0, BENCH_DIR)
+# The handlers under test never reach OpenAI
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import main  # noqa: E402
+from generate_data import generate  # noqa: E402
+from reference_data import load_reference_data  # noqa: E402
+
+
+def load_dataset(lgas_path, clinics_path):
+    """Swap the service's reference data for the generated files."""
+    snapshot_path = os.path.join(os.path.dirname(lgas_path), "reference_data.snap")
+    data = load_reference_data(lgas_path, clinics_path, snapshot_path)
+    main.reference_data.set(data)
+    # Time the lookups themselves, not the memo in front of them
+    for memo in main.lookup_memos.values():
+        memo.max_size = 0
+    return {
+        "lgas": data.lga_count,
+        "clinics": data.clinic_count,
+        "dataset_mb": round(os.path.getsize(snapshot_path) / 1e6, 2),
+    }
+
+
+def misspell(rng, text):
+    """Drop or swap one character, like a user typing on a phone."""
+    if len(text) < 4:
+        return text.lower()
+    i = rng.randrange(1, len(text) - 1)
+    if rng.random() < 0.5:
+        return (text[:i] + text[i + 1:]).lower()
+    return (text[:i] + text[i + 1] + text[i] + text[i + 2:]).lower()
+
+
+def make_cases(rng, lgas_path, clinics_path):
+    with open(lgas_path, newline="", encoding="utf-8") as f:
+        lga_names = [row["LGA"] for row in csv.DictReader(f)]
+    with open(clinics_path, newline="", encoding="utf-8") as f:
+        locations = [(row["LGA"], row["Town/City"]) for row in csv.DictReader(f)]
+    return {
+        "predict_lga": lambda: main.predict_lga(
+            request=main.LGARequest(user_input=misspell(rng, rng.choice(lga_names)))),
+        "refer_to_clinic": lambda: main.refer_to_clinic(
+            request=main.ClinicRequest(**dict(zip(("lga", "city"), rng.choice(locations))))),
+        "get_town_from_lga": lambda: main.get_town_from_lga(
+            request=main.TownRequest(lga=rng.choice(locations)[0])),
+        "get_town_from_lga_messenger": lambda: main.get_town_from_lga_messenger(
+            request=main.TownRequest(lga=rng.choice(locations)[0])),
+        # What a user has typed so far of an LGA or town name
+        "typeahead": lambda: main.typeahead(
+            request=main.TypeaheadRequest(prefix=rng.choice(rng.choice(locations))[:rng.randint(1, 6)])),
+    }
+
+
+def measure(loop, make_call, iterations, time_budget):
+    """Per-call latency percentiles (us) and tracemalloc peak (KB) of one call."""
+    for _ in range(3):
+        loop.run_until_complete(make_call())
+
+    timings = []
+    deadline = time.perf_counter() + time_budget
+    while len(timings) < iterations and (len(timings) < 5 or time.perf_counter() < deadline):
+        coro = make_call()
+        started = time.perf_counter()
+        loop.run_until_complete(coro)
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    loop.run_until_complete(make_call())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "calls": len(timings),
+        "p50_us": round(timings[len(timings) // 2] * 1e6, 1),
+        "p95_us": round(timings[min(len(timings) - 1, int(0.95 * len(timings)))] * 1e6, 1),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def run(scales, iterations, time_budget, seed):
+    results = {}
+    loop = asyncio.new_event_loop()
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as devnull:
+        for scale in scales:
+            out_dir = os.path.join(tmp, f"x{scale}")
+            lgas_path, clinics_path = generate(scale, out_dir, seed=seed)
+            info = load_dataset(lgas_path, clinics_path)
+            print(f"scale {scale}x: {info['lgas']} LGAs, {info['clinics']} clinics, {info['dataset_mb']} MB",
+                  file=sys.stderr)
+            rng = random.Random(seed)
+            handlers = {}
+            for name, make_call in make_cases(rng, lgas_path, clinics_path).items():
+                # Keep any handler output off the results table
+                with redirect_stdout(devnull):
+                    handlers[name] = measure(loop, make_call, iterations, time_budget)
+            results[f"{scale}x"] = {"dataset": info, "handlers": handlers}
+    loop.close()
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Print results next to the baseline; return the regressions found."""
+    regressions = []
+    print(f"{'scale':<6}{'handler':<30}{'calls':>7}{'p50 us':>12}{'p95 us':>12}{'peak KB':>10}{'p50 vs base':>13}")
+    for scale, result in results.items():
+        for name, row in result["handlers"].items():
+            base = baseline.get(scale, {}).get("handlers", {}).get(name)
+            ratio = ""
+            if base:
+                ratio = f"{row['p50_us'] / base['p50_us']:.2f}x" if base["p50_us"] else "-"
+                for metric in ("p50_us", "peak_kb"):
+                    if base[metric] and row[metric] > base[metric] * (1 + tolerance):
+                        regressions.append(f"{scale} {name} {metric}: {row[metric]} > {base[metric]}")
+            print(f"{scale:<6}{name:<30}{row['calls']:>7}{row['p50_us']:>12}{row['p95_us']:>12}"
+                  f"{row['peak_kb']:>10}{ratio:>13}")
+    return regressions
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="1,10,100", help="comma-separated dataset multipliers")
+    parser.add_argument("--iterations", type=int, default=200, help="max timed calls per handler")
+    parser.add_argument("--time-budget", type=float, default=3.0, help="max seconds per handler and scale")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="allowed slowdown or extra memory vs baseline before --check fails")
+    parser.add_argument("--check", action="store_true", help="exit 1 if any metric regressed")
+    parser.add_argument("--update-baseline", action="store_true", help=f"write results to {BASELINE_PATH}")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    scales = [float(s) if "." in s else int(s) for s in args.scales.split(",")]
+    results = run(scales, args.iterations, args.time_budget, args.seed)
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, encoding="utf-8") as f:
+            baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+
+    if args.update_baseline:
+        baseline.update(results)
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {BASELINE_PATH}")
+    elif regressions:
+        print("\nRegressions:\n  " + "\n  ".join(regressions))
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,90 @@
+"""
+Synthetic lgas.csv / clinics.csv in the service's format.
+
+Scale 1 matches today's real footprint (774 LGAs, ~1000 partner clinics);
+10 and 100 model onboarding every state with more partner clinics:
+
+    python benchmarks/generate_data.py --scale 10 --out /tmp/bench-data
+"""
+import argparse
+import csv
+import os
+import random
+
+STATES = [
+    "Abia", "Adamawa", "Akwa Ibom", "Anambra", "Bauchi", "Bayelsa", "Benue", "Borno",
+    "Cross River", "Delta", "Ebonyi", "Edo", "Ekiti", "Enugu", "FCT", "Gombe", "Imo",
+    "Jigawa", "Kaduna", "Kano", "Katsina", "Kebbi", "Kogi", "Kwara", "Lagos", "Nasarawa",
+    "Niger", "Ogun", "Ondo", "Osun", "Oyo", "Plateau", "Rivers", "Sokoto", "Taraba",
+    "Yobe", "Zamfara",
+]
+
+SYLLABLES = ["a", "ba", "bi", "da", "di", "e", "fa", "ga", "gbo", "i", "ja", "ka", "ke", "ko",
+             "la", "le", "lo", "ma", "mo", "na", "ni", "o", "ra", "ri", "sa", "se", "sho",
+             "ta", "to", "u", "wa", "ya", "yo", "za", "ede", "ife", "oke", "uyo", "aba"]
+SUFFIXES = ["", "", "", " North", " South", " East", " West", " Central", "-Osa", " Municipal"]
+STREETS = ["Road", "Street", "Avenue", "Close", "Crescent", "Way"]
+FACILITIES = ["Hospital", "Clinic", "Medical Centre", "Maternity", "Specialist Hospital"]
+
+BASE_LGAS = 774
+BASE_CLINICS = 1000
+TOWNS_PER_LGA = (1, 4)
+
+
+def make_name(rng, parts=(2, 4)):
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(*parts))).capitalize()
+
+
+def unique_names(rng, count, suffixes=SUFFIXES):
+    names = set()
+    while len(names) < count:
+        names.add(make_name(rng) + rng.choice(suffixes))
+    return sorted(names)
+
+
+def generate(scale, out_dir, seed=7):
+    """Write lgas.csv and clinics.csv for scale into out_dir; return their paths."""
+    rng = random.Random(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    n_lgas = int(BASE_LGAS * scale)
+    n_clinics = int(BASE_CLINICS * scale)
+
+    lgas = [(name, rng.choice(STATES)) for name in unique_names(rng, n_lgas)]
+    towns = {lga: unique_names(rng, rng.randint(*TOWNS_PER_LGA), suffixes=[""]) for lga, _ in lgas}
+
+    lgas_path = os.path.join(out_dir, "lgas.csv")
+    with open(lgas_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["LGA", "State"])
+        writer.writerows(lgas)
+
+    clinics_path = os.path.join(out_dir, "clinics.csv")
+    with open(clinics_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Clinic name", "LGA", "Town/City", "Address", "Popular Landmark"])
+        for _ in range(n_clinics):
+            lga, _ = rng.choice(lgas)
+            town = rng.choice(towns[lga])
+            writer.writerow([
+                f"{make_name(rng)} {rng.choice(FACILITIES)}",
+                lga,
+                town,
+                f"{rng.randint(1, 200)} {make_name(rng)} {rng.choice(STREETS)}, {town}",
+                f"Opposite {make_name(rng)} {rng.choice(['Market', 'Church', 'Mosque', 'School'])}"
+                if rng.random() < 0.6 else "",
+            ])
+    return lgas_path, clinics_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=1)
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    for path in generate(args.scale, args.out, args.seed):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,110 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# Point at an OpenAI-compatible server, e.g. the offline stand-in in loadtest/fake_openai.py
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if not OPENAI_API_KEY:
-    raise ValueError("OPENAI_API_KEY environment variable is not set")
+    if not OPENAI_BASE_URL:
+        raise ValueError("OPENAI_API_KEY environment variable is not set")
+    # Local stand-ins do not check the key
+    OPENAI_API_KEY = "offline"
 
 PORT = int(os.getenv("PORT", 8000))
+
+# OpenAI HTTP client (shared by every request in a worker)
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", 100))
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", 20))
+OPENAI_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", 30))
+OPENAI_CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", 5))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", 2))
+
+# Per-call timeouts in seconds
+ANSWER_TIMEOUT = float(os.getenv("ANSWER_TIMEOUT", 30))
+CONTEXT_TIMEOUT = float(os.getenv("CONTEXT_TIMEOUT", 10))
+
+# Local retrieval for the {context} slot of the prompt
+CATALOG_PATH = os.getenv("CATALOG_PATH", "../changefpm-messages-catalog.json")
+KNOWLEDGE_DIR = os.getenv("KNOWLEDGE_DIR", "./knowledge")
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", 3))
+# Share of the question's (idf-weighted) words a passage must contain to be used
+RETRIEVAL_MIN_RELEVANCE = float(os.getenv("RETRIEVAL_MIN_RELEVANCE", 0.5))
+# Ask gpt-3.5 for context when local retrieval finds nothing (off by default)
+OPENAI_CONTEXT_FALLBACK = os.getenv("OPENAI_CONTEXT_FALLBACK", "false").lower() == "true"
+
+# Reference data for the lookup endpoints
+LGAS_PATH = os.getenv("LGAS_PATH", "./data/lgas.csv")
+CLINICS_PATH = os.getenv("CLINICS_PATH", "./data/clinics.csv")
+# Compiled from the two CSVs when missing or older than them; memory-mapped by every worker
+REFERENCE_SNAPSHOT_PATH = os.getenv("REFERENCE_SNAPSHOT_PATH", "./cache/reference_data.snap")
+# Seconds between checks of the CSVs and the snapshot for changes (0 disables hot reload)
+DATA_WATCH_INTERVAL = float(os.getenv("DATA_WATCH_INTERVAL", 10))
+# Enables POST /admin/reload for callers sending it as X-Admin-Token
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN") or None
+# Most completions one /typeahead/ call may ask for
+TYPEAHEAD_MAX_LIMIT = int(os.getenv("TYPEAHEAD_MAX_LIMIT", 50))
+# Most values one JSON /normalize_lgas/ call may send (the CSV variant has no limit)
+NORMALIZE_MAX_VALUES = int(os.getenv("NORMALIZE_MAX_VALUES", 10000))
+# Values matched per worker-thread call, so one large batch does not hold a thread throughout
+NORMALIZE_CHUNK_SIZE = int(os.getenv("NORMALIZE_CHUNK_SIZE", 500))
+# CSV uploads are kept in memory up to this size and spooled to a temporary file past it
+NORMALIZE_CSV_MEMORY_BYTES = int(os.getenv("NORMALIZE_CSV_MEMORY_BYTES", 8 * 1024 * 1024))
+# /normalize_lgas/ leaves a value unmatched when its best LGA scores below this (0 to 1)
+NORMALIZE_MIN_SCORE = float(os.getenv("NORMALIZE_MIN_SCORE", 0.5))
+
+# Answer cache
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", 5000))
+ANSWER_CACHE_TTL = int(os.getenv("ANSWER_CACHE_TTL", 86400))
+ANSWER_CACHE_PATH = os.getenv("ANSWER_CACHE_PATH", "./cache/answer_cache.json")
+ANSWER_CACHE_SNAPSHOT_INTERVAL = int(os.getenv("ANSWER_CACHE_SNAPSHOT_INTERVAL", 300))
+
+# Lookup memo: results kept per endpoint and worker until the reference data changes (0 disables)
+LOOKUP_MEMO_SIZE = int(os.getenv("LOOKUP_MEMO_SIZE", 10000))
+
+# /answer/batch/
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", 5000))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", 8))
+
+# Local COMPLETE / NO ANSWER classifier in front of the model (0 < threshold <= 1, above 1 disables)
+FAST_PATH_THRESHOLD = float(os.getenv("FAST_PATH_THRESHOLD", 0.8))
+
+# Model routing for /answer/
+STRONG_MODEL = os.getenv("STRONG_MODEL", "gpt-4o")
+FAST_MODEL = os.getenv("FAST_MODEL", "gpt-4o-mini")
+ROUTING_ENABLED = os.getenv("ROUTING_ENABLED", "true").lower() == "true"
+ROUTING_THRESHOLD = float(os.getenv("ROUTING_THRESHOLD", 0.3))
+
+# Admission control: in-flight budget and wait queue per endpoint
+ADMISSION_ANSWER_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_ANSWER_MAX_IN_FLIGHT", 64))
+ADMISSION_ANSWER_MAX_QUEUE = int(os.getenv("ADMISSION_ANSWER_MAX_QUEUE", 32))
+ADMISSION_BATCH_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_BATCH_MAX_IN_FLIGHT", 2))
+ADMISSION_LOOKUP_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_LOOKUP_MAX_IN_FLIGHT", 256))
+ADMISSION_LOOKUP_MAX_QUEUE = int(os.getenv("ADMISSION_LOOKUP_MAX_QUEUE", 128))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", 2))
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", 5))
+
+# Resilience around the OpenAI upstream
+ANSWER_DEADLINE = float(os.getenv("ANSWER_DEADLINE", 20))
+CONTEXT_DEADLINE = float(os.getenv("CONTEXT_DEADLINE", 5))
+BREAKER_WINDOW = int(os.getenv("BREAKER_WINDOW", 20))
+BREAKER_MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", 10))
+BREAKER_FAILURE_RATIO = float(os.getenv("BREAKER_FAILURE_RATIO", 0.5))
+BREAKER_SLOW_CALL_SECONDS = float(os.getenv("BREAKER_SLOW_CALL_SECONDS", 10))
+BREAKER_COOLDOWN = float(os.getenv("BREAKER_COOLDOWN", 30))
+HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "false").lower() == "true"
+HEDGE_QUANTILE = float(os.getenv("HEDGE_QUANTILE", 0.95))
+HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", 1))
+
+# Production server (gunicorn.conf.py): worker count ("auto" = CPUs available to the container)
+WORKERS = os.getenv("WORKERS", "auto")
+# Upstream connections each worker opens before reporting ready on /ready
+WARM_UP_PRIME_CONNECTIONS = int(os.getenv("WARM_UP_PRIME_CONNECTIONS", 2))
+WARM_UP_RETRY_INTERVAL = float(os.getenv("WARM_UP_RETRY_INTERVAL", 5))
+
+# Structured logging (JSON lines on stderr, written by a background thread)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Share of high-volume debug lines (per-lookup details) that are kept
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", 0.01))
+LOG_MAX_FIELD_CHARS = int(os.getenv("LOG_MAX_FIELD_CHARS", 500))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
@@ -0,0 +1,128 @@
+from answer_cache import normalize_question
+from language import MARKER_WORDS
+
+COMPLETE = "COMPLETE"
+NO_ANSWER = "NO ANSWER"
+
+# A word starting with any of these stems means the message is about family planning, so it always goes to the model
+DOMAIN_STEMS = (
+    "contracep", "famil", "pill", "condom", "implant", "iud", "ius", "inject", "postinor",
+    "postpill", "sayana", "depo", "progesta", "diaphragm", "lubric", "misoprost", "mifep",
+    "penegra", "pregnan", "period", "menstru", "bleed", "sex", "fertil", "ovulat", "sperm",
+    "birth", "baby", "babies", "womb", "uterus", "vagin", "penis", "erect", "discharge",
+    "abort", "steril", "tubal", "ligat", "vasect", "breastfeed", "clinic", "nurse", "doctor",
+    "side", "effect", "pain", "belle", "pikin", "oyun", "ibalopo", "nkan", "ciki",
+    "haihuwa", "jimai", "allura", "magani", "tsarin", "ime", "mmeko", "ogwu", "nso", "nwa",
+)
+
+# Domain words that normalization splits in two (Hausa "jima'i" -> "jima i"); a bare
+# "jima" stem would also swallow the goodbye "sai an jima"
+DOMAIN_PHRASES = ("jima i",)
+
+# Whole phrases that close a conversation, matched on normalized text
+CLOSING_PHRASES = (
+    "no more questions", "no more question", "no other questions", "no further questions",
+    "i dont have any questions", "i dont have any more questions", "i have no questions",
+    "i have no more questions", "that is all", "thats all", "i am done", "im done",
+    "i no get question again", "i no get any question", "i don finish", "na all",
+    "ko si ibeere mo", "mo ti pari", "babu tambaya", "na gama", "enweghi m ajuju",
+    "o zuola", "sai an jima", "sai anjima", "ka o di", "ka emesia",
+)
+
+# Words that close a conversation on their own
+CLOSING_WORDS = {"bye", "goodbye", "byebye", "odabo"}
+
+# Words that may surround a closing without changing its meaning
+FILLER_WORDS = {
+    "ok", "okay", "alright", "fine", "thanks", "thank", "thankyou", "thx", "tnx", "you",
+    "so", "very", "much", "for", "now", "please", "sir", "ma", "madam", "o", "oh", "again",
+    "honey", "and", "bye", "goodbye", "dear", "well", "all", "good", "great", "cool", "e",
+    "se", "ese", "oseun", "seun", "dupe", "mo", "nagode", "gode", "na", "yawwa", "daalu",
+    "to", "talk",
+    "later", "see", "have", "nice", "day", "night",
+}
+
+# Topics the assistant never answers
+OFF_TOPIC_WORDS = {
+    "sky", "colour", "color", "weather", "rain", "sun", "moon", "football", "soccer",
+    "match", "goal", "arsenal", "chelsea", "politics", "president", "election", "governor",
+    "bitcoin", "crypto", "forex", "dollar", "exchange", "recipe", "cook", "jollof", "movie",
+    "film", "music", "song", "lyrics", "joke", "capital", "math", "maths", "equation",
+    "code", "programming", "python", "javascript", "game", "lottery", "bet", "betting",
+    "fuel", "petrol", "traffic", "flight", "visa", "homework",
+}
+
+STOP_WORDS = {word for words in MARKER_WORDS.values() for word in words.split()}
+
+
+class FastPathClassifier:
+    """
+    Answer obvious goodbyes with COMPLETE and obviously off-topic messages
+    with NO ANSWER without calling the model. Each rule yields a confidence
+    in [0, 1]; only results at or above the threshold are used.
+    """
+
+    def __init__(self, threshold=0.8):
+        self.threshold = threshold
+        self.checked = 0
+        self.complete = 0
+        self.no_answer = 0
+
+    @staticmethod
+    def complete_confidence(text):
+        """Share of tokens explained by closing phrases and filler, if there is a real closing."""
+        closed = 0
+        for phrase in CLOSING_PHRASES:
+            if phrase in text:
+                text = text.replace(phrase, " ")
+                closed += 1
+        tokens = text.split()
+        closed += sum(1 for token in tokens if token in CLOSING_WORDS)
+        if not closed:
+            return 0.0
+        unexplained = sum(1 for token in tokens
+                          if token not in FILLER_WORDS and token not in CLOSING_WORDS)
+        return closed / (closed + unexplained)
+
+    @staticmethod
+    def off_topic_confidence(tokens):
+        """Share of content words (not function words) that are off-topic."""
+        content = [token for token in tokens if token not in STOP_WORDS and token not in FILLER_WORDS]
+        if not content:
+            return 0.0
+        return sum(1 for token in content if token in OFF_TOPIC_WORDS) / len(content)
+
+    def scores(self, question):
+        text = normalize_question(question)
+        tokens = text.split()
+        if (any(token.startswith(DOMAIN_STEMS) for token in tokens)
+                or any(f" {phrase} " in f" {text} " for phrase in DOMAIN_PHRASES)):
+            return {COMPLETE: 0.0, NO_ANSWER: 0.0}
+        return {
+            COMPLETE: self.complete_confidence(text),
+            NO_ANSWER: self.off_topic_confidence(tokens),
+        }
+
+    def sentinel_for(self, question):
+        """COMPLETE, NO ANSWER or None, without counting the check in stats()."""
+        sentinel, confidence = max(self.scores(question).items(), key=lambda item: item[1])
+        return sentinel if confidence >= self.threshold else None
+
+    def classify(self, question):
+        """Return COMPLETE, NO ANSWER, or None when the model should decide."""
+        self.checked += 1
+        sentinel = self.sentinel_for(question)
+        if sentinel == COMPLETE:
+            self.complete += 1
+        elif sentinel == NO_ANSWER:
+            self.no_answer += 1
+        return sentinel
+
+    def stats(self):
+        return {
+            "threshold": self.threshold,
+            "checked": self.checked,
+            "complete": self.complete,
+            "no_answer": self.no_answer,
+            "upstream_calls_saved": self.complete + self.no_answer,
+        }
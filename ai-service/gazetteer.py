@@ -0,0 +1,249 @@
+"""
+LGA gazetteer for /predict_lga/.
+
+Names and states are normalized once, when the reference snapshot is
+compiled, so a prediction only normalizes the user's input. Fuzzy
+matching goes through a BK-tree, which prunes by the triangle inequality
+and so touches a shrinking share of the names as the vocabulary grows.
+The normalized names, the word index and the trees are compiled into the
+snapshot as uint32 tables, which workers read through the shared mapping
+instead of each building its own copy.
+"""
+import heapq
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+
+from retrieval import fold_text
+
+# Hausa hooked letters and curly apostrophes have no decomposition to fold
+FOLD_TABLE = str.maketrans({"ɓ": "b", "ɗ": "d", "ƙ": "k", "ƴ": "y", "’": "'", "‘": "'"})
+
+# Snapshot sections (uint32 columns per row):
+#   lga_words: normalized name of each LGA
+#   gazetteer_partitions: (state key, first token, end token, first node, end node), nationwide first
+#   gazetteer_tokens: (word, first posting, end posting), sorted by word within a partition
+#   gazetteer_postings: ascending indexes of the LGAs containing a word
+#   gazetteer_nodes: (LGA index, first edge, end edge, start, end of the normalized name
+#     in the string data) per BK-tree node, root first within a partition
+#   gazetteer_distances, gazetteer_children: per edge, by distance within a node
+GAZETTEER_SECTIONS = (("lga_words", 1), ("gazetteer_partitions", 5), ("gazetteer_tokens", 3),
+                      ("gazetteer_postings", 1), ("gazetteer_nodes", 5), ("gazetteer_distances", 1),
+                      ("gazetteer_children", 1))
+
+
+def clean_text(text):
+    """Normalize an LGA name or user input: 'Ọ̀yọ́ (East)' -> 'oyo east'."""
+    text = fold_text(text).translate(FOLD_TABLE)
+    text = text.replace("-", " ")
+    text = text.replace("/", " ")
+    text = text.replace("'", "")
+    text = text.replace("(", "")
+    text = text.replace(")", "")
+    return text
+
+
+def completion_key(text):
+    """clean_text with runs of spaces collapsed, for prefix matching."""
+    return " ".join(clean_text(text).split())
+
+
+def state_key(state):
+    """Normalize a state name for lookup: 'Akwa-Ibom State' -> 'akwa ibom'."""
+    key = completion_key(state)
+    return key[:-len(" state")] if key.endswith(" state") else key
+
+
+def similarity(distance, a, b):
+    """Edit distance as a score in [0, 1], 1 for identical strings."""
+    longest = max(len(a), len(b))
+    return round(1 - distance / longest, 3) if longest else 1.0
+
+
+def bk_tree_children(words):
+    """Per node of a BK-tree over words (words[0] at the root): {distance to the node: child node}."""
+    import Levenshtein
+
+    children = [{} for _ in words]
+    for node in range(1, len(words)):
+        parent = 0
+        while True:
+            distance = Levenshtein.distance(words[parent], words[node])
+            child = children[parent].get(distance)
+            if child is None:
+                children[parent][distance] = node
+                break
+            parent = child
+    return children
+
+
+def compile_gazetteer(lgas, intern, span):
+    """
+    GAZETTEER_SECTIONS as uint32 arrays for (name, state) pairs.
+    intern(text) gives a string id, span(id) its (start, end) in the string data.
+    """
+    tables = {name: array("I") for name, _ in GAZETTEER_SECTIONS}
+    cleaned = [clean_text(name) for name, _ in lgas]
+    words = tables["lga_words"]
+    words.extend(intern(word) for word in cleaned)
+
+    members = {}
+    for index, (_, state) in enumerate(lgas):
+        members.setdefault(state_key(state), []).append(index)
+    members.pop("", None)
+    tokens, postings, nodes, distances, children = (
+        tables[f"gazetteer_{name}"] for name in ("tokens", "postings", "nodes", "distances", "children"))
+    for key, ids in [("", list(range(len(lgas))))] + sorted(members.items()):
+        token_index = {}
+        for index in ids:
+            for token in set(cleaned[index].split()):
+                token_index.setdefault(token, []).append(index)
+        first_token = len(tokens) // 3
+        for token in sorted(token_index):
+            tokens.extend((intern(token), len(postings), len(postings) + len(token_index[token])))
+            postings.extend(token_index[token])
+
+        first_node = len(nodes) // 5
+        for index, edges in zip(ids, bk_tree_children([cleaned[i] for i in ids])):
+            first_edge = len(distances)
+            for distance, child in sorted(edges.items()):
+                distances.append(distance)
+                children.append(first_node + child)
+            nodes.extend((index, first_edge, len(distances), *span(words[index])))
+        tables["gazetteer_partitions"].extend(
+            (intern(key), first_token, len(tokens) // 3, first_node, len(nodes) // 5))
+    return tables
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over LGA words under Levenshtein distance, read
+    from the node and edge tables and the snapshot's string data. LGA
+    indexes break distance ties.
+    """
+
+    def __init__(self, nodes, distances, children, root, data):
+        self.nodes = nodes
+        self.distances = distances
+        self.children = children
+        self.root = root
+        self.data = data
+
+    def nearest(self, query, n, skip=()):
+        """The n (distance, LGA index) nearest query, closest first, indexes in skip left out."""
+        import Levenshtein
+
+        if n <= 0:
+            return []
+        distance_to = Levenshtein.distance
+        nodes, distances, children, data = self.nodes, self.distances, self.children, self.data
+
+        # Max-heap of the n best (-distance, -index); radius is its worst distance
+        best = []
+        radius = sys.maxsize
+        # Best-first by the lower bound on any distance in a subtree
+        queue = [(0, self.root)]
+        while queue:
+            bound, node = heapq.heappop(queue)
+            if bound > radius:
+                break
+            row = 5 * node
+            index = nodes[row]
+            distance = distance_to(str(data[nodes[row + 3]:nodes[row + 4]], "utf-8"), query)
+            if distance <= radius and index not in skip:
+                entry = (-distance, -index)
+                if len(best) < n:
+                    heapq.heappush(best, entry)
+                    if len(best) == n:
+                        radius = -best[0][0]
+                elif entry > best[0]:
+                    heapq.heapreplace(best, entry)
+                    radius = -best[0][0]
+            first_edge, end_edge = nodes[row + 1], nodes[row + 2]
+            if first_edge < end_edge:
+                # |d(q, node) - d(node, w)| <= d(q, w) for every w below a child, so only
+                # children at distance - radius to distance + radius can hold a closer word
+                low = bisect_left(distances, distance - radius, first_edge, end_edge)
+                for edge in range(low, bisect_right(distances, distance + radius, low, end_edge)):
+                    heapq.heappush(queue, (abs(distance - distances[edge]), children[edge]))
+        return sorted((-distance, -index) for distance, index in best)
+
+
+class LgaGazetteer:
+    """
+    LGAs of a ReferenceSnapshot as (name, state) pairs in file order (the
+    same name may be in several states), matched through the compiled
+    gazetteer tables nationwide and per state.
+    """
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.words = snapshot.sections["lga_words"]
+        self.tokens = snapshot.sections["gazetteer_tokens"]
+        self.postings = snapshot.sections["gazetteer_postings"]
+        partitions = snapshot.sections["gazetteer_partitions"]
+        partition = [self._partition(partitions[5 * p:5 * p + 5]) for p in range(len(partitions) // 5)]
+        self.everywhere = partition[0] if partition else (0, 0, None)
+        self.by_state = {snapshot.string(partitions[5 * p]): partition[p] for p in range(1, len(partition))}
+
+    def _partition(self, row):
+        """(first token, end token, BKTree or None when empty) for a partition row."""
+        _, first_token, end_token, first_node, end_node = row
+        sections = self.snapshot.sections
+        tree = BKTree(sections["gazetteer_nodes"], sections["gazetteer_distances"], sections["gazetteer_children"],
+                      first_node, sections["string_data"]) if end_node > first_node else None
+        return first_token, end_token, tree
+
+    def __len__(self):
+        return len(self.words)
+
+    def word(self, index):
+        """Normalized name of LGA index."""
+        return self.snapshot.string(self.words[index])
+
+    def has_state(self, state):
+        return state_key(state) in self.by_state
+
+    def _containing(self, first_token, end_token, word):
+        """Ascending indexes of the LGAs with word among their words, in a partition's token range."""
+        string, tokens = self.snapshot.string, self.tokens
+        low, high = first_token, end_token
+        while low < high:
+            middle = (low + high) // 2
+            if string(tokens[3 * middle]) < word:
+                low = middle + 1
+            else:
+                high = middle
+        if low < end_token and string(tokens[3 * low]) == word:
+            return self.postings[tokens[3 * low + 1]:tokens[3 * low + 2]].tolist()
+        return []
+
+    def score(self, index, query, distance):
+        """Similarity of query to the LGA's name, or to one word of it when that is closer."""
+        import Levenshtein
+
+        word = self.word(index)
+        return max([similarity(distance, word, query)] +
+                   [similarity(Levenshtein.distance(part, query), part, query) for part in word.split()])
+
+    def closest(self, user_input, n=3, state=None):
+        """
+        (name, state, score) of the LGAs with a word equal to the input and
+        of the n minus that many nearest, best score first (then nearest
+        whole name, then file order). With state, only that state's LGAs
+        are searched. score is the normalized edit similarity to the name
+        or to one word of it, so 1.0 for the name or one of its words.
+        """
+        import Levenshtein
+
+        first_token, end_token, tree = self.by_state.get(state_key(state), (0, 0, None)) if state else self.everywhere
+        if tree is None:
+            return []
+        query = completion_key(user_input)
+        exact = self._containing(first_token, end_token, query)
+        if exact:
+            n = max(0, n - len(exact))
+        candidates = [(Levenshtein.distance(self.word(i), query), i) for i in exact]
+        candidates += tree.nearest(query, n, skip=set(exact))
+        ranked = sorted((-self.score(i, query, distance), distance, i) for distance, i in candidates)
+        return [(*self.snapshot.lga(i), -score) for score, _, i in ranked]
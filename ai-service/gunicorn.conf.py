@@ -0,0 +1,66 @@
+"""
+Production server: one gunicorn master, N uvicorn workers.
+
+The master imports the app and preloads the reference snapshot, the
+knowledge index and the heavy libraries once, then forks the workers,
+which inherit all of it. Each worker then primes its upstream connections
+and turns GET /ready green.
+
+    gunicorn -c gunicorn.conf.py main:app
+"""
+import glob
+import math
+import os
+import tempfile
+
+from config import PORT, WORKERS
+
+
+def available_cpus():
+    """CPUs this container may use: the cgroup CPU quota if set, else the CPUs it may run on."""
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    for quota_file, period_file in (("/sys/fs/cgroup/cpu.max", None),
+                                    ("/sys/fs/cgroup/cpu/cpu.cfs_quota_us", "/sys/fs/cgroup/cpu/cpu.cfs_period_us")):
+        try:
+            with open(quota_file) as f:
+                values = f.read().split()
+            if period_file:
+                with open(period_file) as f:
+                    values.append(f.read().strip())
+            quota, period = values[0], values[1]
+            if quota not in ("max", "-1"):
+                return max(1, min(cpus, math.ceil(int(quota) / int(period))))
+        except (OSError, ValueError, IndexError):
+            continue
+    return cpus
+
+
+# Request metrics are shared between workers through files in this folder.
+# It has to be set before the app (and prometheus_client) is imported.
+metrics_dir = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), f"ai-service-metrics-{PORT}"))
+os.makedirs(metrics_dir, exist_ok=True)
+for stale in glob.glob(os.path.join(metrics_dir, "*.db")):
+    os.remove(stale)
+
+bind = f"0.0.0.0:{PORT}"
+workers = available_cpus() if WORKERS == "auto" else int(WORKERS)
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = 60
+graceful_timeout = 30
+keepalive = 5
+
+
+def on_starting(server):
+    # The app is already imported (preload_app); load its data before any worker exists
+    import main
+
+    main.preload()
+    server.log.info("Preloaded reference data and knowledge index, starting %s workers", workers)
+
+
+def child_exit(server, worker):
+    from metrics import mark_worker_dead
+
+    mark_worker_dead(worker.pid)
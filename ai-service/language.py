@@ -0,0 +1,83 @@
+import re
+import unicodedata
+
+LANGUAGES = ("en", "pcm", "yo", "ha", "ig")
+
+LANGUAGE_NAMES = {
+    "en": "English",
+    "pcm": "Nigerian Pidgin",
+    "yo": "Yoruba",
+    "ha": "Hausa",
+    "ig": "Igbo",
+}
+
+# Function words and everyday vocabulary, compared after diacritic folding.
+# A word listed under several languages splits its weight between them.
+MARKER_WORDS = {
+    "en": """what is the how can i my do does it to of and are you which when should
+        after take use safe get pregnant have there will about why this that with for
+        if me much long side effects thanks thank questions more""",
+    "pcm": """wetin dey una abeg wey sabi wan belle pikin dem sef comot wahala abi nko
+        jare sha shey don fit am na make dis dat wen oya kuku ehen be go im say""",
+    "yo": """kini ni mo se bawo oyun ti fun wa o ki lati ko mi mu omo oogun ibalopo
+        nko ati pelu si yi yii jowo emi awon bi lo ma je igba le eyi gbogbo okunrin
+        obinrin tun""",
+    "ha": """menene ina da ne ce yaya ciki kuma shi ba ta don za na ko mai wannan sosai
+        haihuwa magani maganin tsarin iyali kai ki kina kana nake nawa yadda zan zai
+        mace namiji jima aure lafiya yi wani sun su mu tambaya nagode""",
+    "ig": """gini bu ka nke m nwere ime ogwu biko na ya onye nwanyi nwoke ihe otu kedu
+        ole ma aka ahu di ga o anyi unu enweghi mgbe maka nchebe mmeko kwa ubochi
+        dalu ajuju""",
+}
+
+# Letters that only (or almost only) appear in one of the languages
+MARKER_CHARS = {
+    "yo": "ẹṣ",
+    "ha": "ɗƙɓƴ",
+    "ig": "ịụṅ",
+}
+MARKER_CHAR_WEIGHT = 3.0
+
+TOKEN_RE = re.compile(r"[a-z]+")
+
+
+def _build_word_weights():
+    owners = {}
+    for language, words in MARKER_WORDS.items():
+        for word in set(words.split()):
+            owners.setdefault(word, []).append(language)
+    return {word: [(language, 1.0 / len(langs)) for language in langs]
+            for word, langs in owners.items()}
+
+
+WORD_WEIGHTS = _build_word_weights()
+CHAR_LANGUAGE = {ch: language for language, chars in MARKER_CHARS.items() for ch in chars}
+
+
+def language_scores(text):
+    """Score every supported language for text from marker words and letters."""
+    scores = dict.fromkeys(LANGUAGES, 0.0)
+    lowered = text.lower()
+    for ch in lowered:
+        language = CHAR_LANGUAGE.get(ch)
+        if language:
+            scores[language] += MARKER_CHAR_WEIGHT
+    folded = "".join(ch for ch in unicodedata.normalize("NFKD", lowered)
+                     if not unicodedata.combining(ch))
+    for token in TOKEN_RE.findall(folded):
+        for language, weight in WORD_WEIGHTS.get(token, ()):
+            scores[language] += weight
+    return scores
+
+
+def detect_language(text, min_score=1.0):
+    """
+    Best-guess language code for text ('en', 'pcm', 'yo', 'ha', 'ig'),
+    or 'unknown' when there is too little evidence or a tie.
+    """
+    scores = language_scores(text)
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    (best, best_score), (_, runner_up) = ranked[0], ranked[1]
+    if best_score < min_score or best_score == runner_up:
+        return "unknown"
+    return best
@@ -0,0 +1,147 @@
+"""
+Bulk mapping of free-text LGA values (such as User.selected_lga) to
+canonical LGAs, for backfills.
+
+Values are de-duplicated on their normalized form (and state), so each
+distinct spelling is matched once however often it occurs. The service
+exposes this as POST /normalize_lgas/ (JSON) and /normalize_lgas/csv/
+(CSV stream). Offline, a CSV export is matched across a pool of processes:
+
+    python lga_normalizer.py users.csv --column selected_lga --state-column selected_state > users_lga.csv
+"""
+import argparse
+import csv
+import multiprocessing
+import os
+import sys
+import time
+
+from gazetteer import completion_key, state_key
+from reference_snapshot import ReferenceSnapshot, SnapshotRejected, ensure_snapshot
+
+# Appended to each CSV row
+RESULT_COLUMNS = ("lga_match", "state_match", "score")
+
+
+def match_key(value, state=None):
+    """Normalized (value, state); rows with the same key get the same match."""
+    return completion_key(value), state_key(state) if state else ""
+
+
+class BulkNormalizer:
+    """
+    Best LGA per distinct (value, state), matched once and remembered.
+    Values whose best LGA scores below min_score are left unmatched.
+    """
+
+    def __init__(self, gazetteer, min_score=0.0):
+        self.gazetteer = gazetteer
+        self.min_score = min_score
+        self.matches = {}
+
+    def match(self, key):
+        """(lga, state, score) of the top LGA for a match_key, None for a blank or unmatched value."""
+        value, state = key
+        if not value:
+            return None
+        # An unknown state is ignored rather than matching nothing
+        if state and not self.gazetteer.has_state(state):
+            state = ""
+        # Ranked among the same candidates as /predict_lga/, so the top one agrees with it
+        found = self.gazetteer.closest(value, n=5, state=state or None)
+        return found[0] if found and found[0][2] >= self.min_score else None
+
+    def normalize(self, rows):
+        """(lga, state, score) or None for each (value, state) row, in order."""
+        results = []
+        for value, state in rows:
+            key = match_key(value, state)
+            if key not in self.matches:
+                self.matches[key] = self.match(key)
+            results.append(self.matches[key])
+        return results
+
+
+def result_fields(match):
+    """RESULT_COLUMNS values for a CSV row ('' when nothing matched)."""
+    return list(match) if match else ["", "", ""]
+
+
+_worker_normalizer = None
+
+
+def _init_worker(snapshot_path, min_score):
+    global _worker_normalizer
+    _worker_normalizer = BulkNormalizer(ReferenceSnapshot(snapshot_path).gazetteer, min_score)
+
+
+def _match_keys(keys):
+    return [_worker_normalizer.match(key) for key in keys]
+
+
+def match_keys(snapshot_path, keys, workers, min_score=0.0, chunk_size=500):
+    """{key: match} for keys, matched by a pool of workers (in process when workers <= 1)."""
+    if workers <= 1 or len(keys) <= chunk_size:
+        _init_worker(snapshot_path, min_score)
+        return dict(zip(keys, _match_keys(keys)))
+    chunks = [keys[i:i + chunk_size] for i in range(0, len(keys), chunk_size)]
+    matches = {}
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(snapshot_path, min_score)) as pool:
+        for chunk, chunk_matches in zip(chunks, pool.imap(_match_keys, chunks)):
+            matches.update(zip(chunk, chunk_matches))
+    return matches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", nargs="?", default="-", help="CSV file with a header row (default: stdin)")
+    parser.add_argument("--column", default="selected_lga", help="column with the raw LGA values")
+    parser.add_argument("--state-column", default="selected_state",
+                        help="column with the user's state, used when present")
+    parser.add_argument("--output", default="-", help="CSV to write (default: stdout)")
+    parser.add_argument("--min-score", type=float, default=0.5,
+                        help="leave values whose best LGA scores lower unmatched (default: 0.5)")
+    parser.add_argument("--lgas", default="./data/lgas.csv")
+    parser.add_argument("--clinics", default="./data/clinics.csv")
+    parser.add_argument("--snapshot", default="./cache/reference_data.snap")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    try:
+        ensure_snapshot(args.lgas, args.clinics, args.snapshot)
+    except SnapshotRejected as e:
+        print(f"{e}; matching against it", file=sys.stderr)
+
+    source = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8-sig")
+    with source:
+        reader = csv.reader(source)
+        header = next(reader, None)
+        if header is None or args.column not in header:
+            parser.error(f"input has no {args.column!r} column")
+        rows = list(reader)
+    value_at = header.index(args.column)
+    state_at = header.index(args.state_column) if args.state_column in header else None
+
+    def row_key(row):
+        value = row[value_at] if value_at < len(row) else ""
+        state = row[state_at] if state_at is not None and state_at < len(row) else None
+        return match_key(value, state)
+
+    keys = list(dict.fromkeys(row_key(row) for row in rows))
+    matches = match_keys(args.snapshot, keys, args.workers, args.min_score)
+
+    target = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    with target:
+        writer = csv.writer(target)
+        writer.writerow(header + list(RESULT_COLUMNS))
+        for row in rows:
+            writer.writerow(row + result_fields(matches[row_key(row)]))
+
+    matched = sum(1 for match in matches.values() if match)
+    print(f"{len(rows)} rows, {len(keys)} distinct values, {matched} matched, "
+          f"{time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import asyncio
+
+from config import (
+    OPENAI_API_KEY,
+    OPENAI_BASE_URL,
+    OPENAI_MAX_CONNECTIONS,
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+    OPENAI_KEEPALIVE_EXPIRY,
+    OPENAI_CONNECT_TIMEOUT,
+    OPENAI_MAX_RETRIES,
+    ANSWER_TIMEOUT,
+    BREAKER_WINDOW,
+    BREAKER_MIN_CALLS,
+    BREAKER_FAILURE_RATIO,
+    BREAKER_SLOW_CALL_SECONDS,
+    BREAKER_COOLDOWN,
+    HEDGE_ENABLED,
+    HEDGE_QUANTILE,
+    HEDGE_MIN_DELAY,
+)
+from resilience import CircuitBreaker, ResilientUpstream, is_upstream_failure
+
+_client = None
+
+
+def is_openai_failure(error):
+    """is_upstream_failure, counting openai's connection errors (timeouts included) too."""
+    import openai
+
+    return isinstance(error, openai.APIConnectionError) or is_upstream_failure(error)
+
+
+# Every OpenAI call goes through this, so one breaker sees the health of the upstream
+openai_upstream = ResilientUpstream(
+    "openai",
+    CircuitBreaker(
+        window=BREAKER_WINDOW,
+        min_calls=BREAKER_MIN_CALLS,
+        failure_ratio=BREAKER_FAILURE_RATIO,
+        slow_call_seconds=BREAKER_SLOW_CALL_SECONDS,
+        cooldown=BREAKER_COOLDOWN,
+    ),
+    hedge_enabled=HEDGE_ENABLED,
+    hedge_quantile=HEDGE_QUANTILE,
+    hedge_min_delay=HEDGE_MIN_DELAY,
+    is_failure=is_openai_failure,
+)
+
+
+def get_client() -> "openai.AsyncOpenAI":
+    """
+    Return the worker-wide async OpenAI client.
+    The client is created on first use and keeps a bounded pool of
+    keep-alive connections, so concurrent chats reuse the same sockets
+    instead of opening a new TLS connection per request.
+    """
+    global _client
+    if _client is None:
+        # openai and httpx take ~0.4 s to import; pay that on first use, not at boot
+        import httpx
+        import openai
+
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(ANSWER_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT),
+        )
+        _client = openai.AsyncOpenAI(
+            api_key=OPENAI_API_KEY,
+            base_url=OPENAI_BASE_URL,
+            max_retries=OPENAI_MAX_RETRIES,
+            http_client=http_client,
+        )
+    return _client
+
+
+async def prime_connections(count):
+    """
+    Open up to count pooled connections to the upstream before traffic
+    arrives, so the first answers skip the TCP/TLS handshake. Uses the
+    token-free models endpoint; returns how many connections were made.
+    """
+    import openai
+
+    client = get_client().with_options(max_retries=0)
+    results = await asyncio.gather(
+        *(client.models.list(timeout=OPENAI_CONNECT_TIMEOUT) for _ in range(count)),
+        return_exceptions=True,
+    )
+    # An HTTP error status still means the connection is open
+    return sum(1 for result in results
+               if not isinstance(result, Exception) or isinstance(result, openai.APIStatusError))
+
+
+async def close_client():
+    """Close the shared client and release its pooled connections."""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
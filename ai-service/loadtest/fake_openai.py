@@ -0,0 +1,140 @@
+"""
+Offline stand-in for the OpenAI chat completions API.
+
+Serves /v1/chat/completions (plain and streaming) with a configurable
+latency distribution, token rate and injected errors, so the AI service
+can be load-tested without spending tokens:
+
+    python loadtest/fake_openai.py --port 9100 --latency-median 0.8
+    OPENAI_BASE_URL=http://127.0.0.1:9100/v1 python -m uvicorn main:app
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+ANSWER = (
+    "Postinor is an emergency contraceptive pill that helps prevent pregnancy after "
+    "unprotected sex. It works best if taken within 72 hours. It is for emergencies, "
+    "not regular family planning."
+)
+
+app = FastAPI()
+settings = argparse.Namespace(
+    latency_median=0.8,
+    latency_sigma=0.5,
+    tokens_per_second=60.0,
+    completion_tokens=60,
+    error_rate=0.0,
+    rate_limit_rate=0.0,
+    seed=None,
+)
+counters = {"requests": 0, "streams": 0, "errors": 0, "rate_limited": 0}
+
+
+def completion_words(n_tokens):
+    words = ANSWER.split()
+    return [words[i % len(words)] for i in range(n_tokens)]
+
+
+def injected_error():
+    roll = random.random()
+    if roll < settings.rate_limit_rate:
+        counters["rate_limited"] += 1
+        return JSONResponse(status_code=429, content={"error": {"message": "Rate limit reached", "type": "requests"}})
+    if roll < settings.rate_limit_rate + settings.error_rate:
+        counters["errors"] += 1
+        return JSONResponse(status_code=500, content={"error": {"message": "Injected failure", "type": "server_error"}})
+    return None
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    counters["requests"] += 1
+    model = body.get("model", "gpt-4o")
+    n_tokens = min(int(body.get("max_tokens") or settings.completion_tokens), settings.completion_tokens)
+    created = int(time.time())
+
+    # Time to first token, log-normally distributed around the median
+    await asyncio.sleep(random.lognormvariate(0, settings.latency_sigma) * settings.latency_median)
+    error = injected_error()
+    if error is not None:
+        return error
+
+    words = completion_words(n_tokens)
+    token_delay = 1.0 / settings.tokens_per_second if settings.tokens_per_second > 0 else 0.0
+
+    if body.get("stream"):
+        counters["streams"] += 1
+
+        async def events():
+            for index, word in enumerate(words):
+                chunk = {
+                    "id": "chatcmpl-offline",
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": word if index == 0 else " " + word},
+                                 "finish_reason": None}],
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+                await asyncio.sleep(token_delay)
+            done = {"id": "chatcmpl-offline", "object": "chat.completion.chunk", "created": created,
+                    "model": model, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+            yield f"data: {json.dumps(done)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    await asyncio.sleep(token_delay * len(words))
+    prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in body.get("messages", []))
+    return {
+        "id": "chatcmpl-offline",
+        "object": "chat.completion",
+        "created": created,
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": " ".join(words)},
+                     "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(words),
+                  "total_tokens": prompt_tokens + len(words)},
+    }
+
+
+@app.get("/stats")
+def stats():
+    return counters
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-median", type=float, default=settings.latency_median,
+                        help="median seconds before the first token")
+    parser.add_argument("--latency-sigma", type=float, default=settings.latency_sigma,
+                        help="log-normal sigma of the first-token latency (0 = constant)")
+    parser.add_argument("--tokens-per-second", type=float, default=settings.tokens_per_second,
+                        help="generation speed after the first token (0 = instant)")
+    parser.add_argument("--completion-tokens", type=int, default=settings.completion_tokens,
+                        help="tokens per completion, capped by the request's max_tokens")
+    parser.add_argument("--error-rate", type=float, default=settings.error_rate,
+                        help="share of requests answered with HTTP 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=settings.rate_limit_rate,
+                        help="share of requests answered with HTTP 429")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    vars(settings).update({k: v for k, v in vars(args).items() if k not in ("host", "port")})
+    if args.seed is not None:
+        random.seed(args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Open-loop load test for the AI service.
+
+Fires requests at a fixed arrival rate (independent of how fast the
+service answers) across a weighted mix of endpoints, then reports
+p50/p95/p99 latency, status codes and throughput per endpoint:
+
+    python loadtest/run_loadtest.py --url http://127.0.0.1:8000 --rps 50 --duration 60 \\
+        --mix answer=1,predict_lga=3,refer_to_clinic=1,get_town_from_lga=1
+"""
+import argparse
+import asyncio
+import csv
+import json
+import random
+import time
+from collections import Counter, defaultdict
+
+import httpx
+
+QUESTIONS = [
+    "What is Postinor?",
+    "Wetin be implant?",
+    "How long does Sayana Press last?",
+    "Kini Postinor?",
+    "Menene allura?",
+    "Gịnị bụ IUD?",
+    "Can I use condom and pills together?",
+    "I missed my pill yesterday, what should I do?",
+    "Does implant cause weight gain?",
+    "No more questions",
+]
+
+LGAS = ["Ikeja", "ikeja lga", "Alimosho", "alimosho ", "Lagos Island", "Eti Osa", "Surulere",
+        "Aba South", "Ibadan North", "Port Harcourt", "Nasarawa", "Kano Municipal"]
+
+LOCATIONS = [("Alimosho", "Idimu"), ("Ikeja", "Ikeja GRA"), ("Aba South", "Aba"),
+             ("Port-Harcourt", "Port Harcourt")]
+
+ENDPOINTS = {
+    "answer": "/answer/",
+    "predict_lga": "/predict_lga/",
+    "refer_to_clinic": "/refer_to_clinic/",
+    "get_town_from_lga": "/get_town_from_lga/",
+    "typeahead": "/typeahead/",
+}
+
+
+def load_data(args):
+    """Use real LGA and clinic names when the CSVs are given."""
+    lgas, locations = LGAS, LOCATIONS
+    if args.lgas_csv:
+        with open(args.lgas_csv, newline="", encoding="utf-8") as f:
+            lgas = [row["LGA"] for row in csv.DictReader(f) if row.get("LGA")] or LGAS
+    if args.clinics_csv:
+        with open(args.clinics_csv, newline="", encoding="utf-8") as f:
+            locations = [(row["LGA"], row["Town/City"]) for row in csv.DictReader(f)
+                         if row.get("LGA") and row.get("Town/City")] or LOCATIONS
+    return lgas, locations
+
+
+def make_payload(endpoint, sequence, args, lgas, locations):
+    if endpoint == "answer":
+        question = random.choice(QUESTIONS)
+        if random.random() < args.answer_unique:
+            # Defeat the answer cache and request coalescing
+            question = f"{question} ({sequence})"
+        return {"memory": {"user": question}}
+    if endpoint == "predict_lga":
+        return {"user_input": random.choice(lgas)}
+    if endpoint == "typeahead":
+        return {"prefix": random.choice(lgas)[:random.randint(1, 6)]}
+    lga, city = random.choice(locations)
+    if endpoint == "refer_to_clinic":
+        return {"lga": lga, "city": city}
+    return {"lga": lga}
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise SystemExit(f"Unknown endpoint in --mix: {name} (choose from {', '.join(ENDPOINTS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(ordered, q):
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run(args):
+    mix = parse_mix(args.mix)
+    names, weights = list(mix), list(mix.values())
+    lgas, locations = load_data(args)
+    results = defaultdict(list)
+    statuses = defaultdict(Counter)
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout) as client:
+        async def one(sequence):
+            endpoint = random.choices(names, weights)[0]
+            payload = make_payload(endpoint, sequence, args, lgas, locations)
+            started = time.perf_counter()
+            try:
+                response = await client.post(ENDPOINTS[endpoint], json=payload)
+                status = str(response.status_code)
+                if response.status_code == 200 and endpoint == "answer" and response.json().get("degraded"):
+                    status = "200-degraded"
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            results[endpoint].append(time.perf_counter() - started)
+            statuses[endpoint][status] += 1
+
+        tasks = []
+        interval = 1.0 / args.rps
+        started = time.perf_counter()
+        total = int(args.rps * args.duration)
+        for sequence in range(total):
+            # Open loop: schedule by wall clock, not by completions
+            delay = started + sequence * interval - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.ensure_future(one(sequence)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+    report = {"target_rps": args.rps, "duration_seconds": round(elapsed, 2), "endpoints": {}}
+    for endpoint in names:
+        ordered = sorted(results[endpoint])
+        ok = statuses[endpoint].get("200", 0)
+        report["endpoints"][endpoint] = {
+            "requests": len(ordered),
+            "ok": ok,
+            "throughput_rps": round(len(ordered) / elapsed, 2),
+            "p50_ms": _ms(percentile(ordered, 0.50)),
+            "p95_ms": _ms(percentile(ordered, 0.95)),
+            "p99_ms": _ms(percentile(ordered, 0.99)),
+            "max_ms": _ms(ordered[-1] if ordered else None),
+            "statuses": dict(statuses[endpoint]),
+        }
+    return report
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+def print_report(report):
+    print(f"target {report['target_rps']} rps over {report['duration_seconds']} s")
+    print(f"{'endpoint':<20}{'reqs':>7}{'rps':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}  statuses")
+    for endpoint, row in report["endpoints"].items():
+        print(f"{endpoint:<20}{row['requests']:>7}{row['throughput_rps']:>8}"
+              f"{row['p50_ms'] or '-':>10}{row['p95_ms'] or '-':>10}{row['p99_ms'] or '-':>10}"
+              f"{row['max_ms'] or '-':>10}  {row['statuses']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--rps", type=float, default=20, help="target arrival rate")
+    parser.add_argument("--duration", type=float, default=30, help="seconds of load")
+    parser.add_argument("--mix", default="answer=1,predict_lga=1,refer_to_clinic=1,get_town_from_lga=1",
+                        help="endpoint=weight pairs")
+    parser.add_argument("--answer-unique", type=float, default=0.5,
+                        help="share of /answer/ questions made unique to bypass caching")
+    parser.add_argument("--lgas-csv", help="draw LGA inputs from this lgas.csv")
+    parser.add_argument("--clinics-csv", help="draw LGA/city inputs from this clinics.csv")
+    parser.add_argument("--max-connections", type=int, default=500)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--json", help="also write the report to this file")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Structured, queue-backed logging.
+
+Handlers call log(); the record goes onto a bounded queue and a
+background thread formats it as one JSON line on stderr, so request
+handlers never block on stdout. Each line carries the request ID of the
+request that produced it. High-volume debug lines can be sampled, and
+long field values are truncated before they are queued.
+"""
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import uuid
+
+LOGGER_NAME = "ai_service"
+
+logger = logging.getLogger(LOGGER_NAME)
+request_id_var = contextvars.ContextVar("request_id", default=None)
+
+_settings = {"sample_rate": 1.0, "max_field_chars": 500}
+_listener = None
+_dropped = 0
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        line = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "event": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        line.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            line["exc"] = self.formatException(record.exc_info)
+        return json.dumps(line, ensure_ascii=False, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue records as they are; drop (and count) them when the queue is full."""
+
+    def prepare(self, record):
+        # Formatting happens on the listener thread, not the request path
+        return record
+
+    def enqueue(self, record):
+        global _dropped
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _dropped += 1
+
+
+def truncate(value, limit):
+    if isinstance(value, str) and len(value) > limit:
+        return f"{value[:limit]}...(+{len(value) - limit} chars)"
+    if isinstance(value, (list, tuple)) and len(value) > limit:
+        return list(value[:limit]) + [f"...(+{len(value) - limit} items)"]
+    return value
+
+
+def log(level, event, sample=False, exc_info=False, **fields):
+    """
+    Log event with extra key/value fields.
+    sample=True keeps only LOG_DEBUG_SAMPLE_RATE of these lines.
+    """
+    if not logger.isEnabledFor(level):
+        return
+    if sample and random.random() >= _settings["sample_rate"]:
+        return
+    limit = _settings["max_field_chars"]
+    logger.log(level, event, exc_info=exc_info, extra={
+        "request_id": request_id_var.get(),
+        "fields": {key: truncate(value, limit) for key, value in fields.items()},
+    })
+
+
+def setup_logging(level="INFO", sample_rate=1.0, max_field_chars=500, queue_size=10000):
+    """Route the service logger through a bounded queue to a JSON stderr writer."""
+    global _listener
+    if _listener is not None:
+        return
+    _settings.update(sample_rate=sample_rate, max_field_chars=max_field_chars)
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(JsonFormatter())
+    log_queue = queue.Queue(maxsize=queue_size)
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    _listener.start()
+
+    logger.handlers[:] = [DroppingQueueHandler(log_queue)]
+    logger.setLevel(level)
+    logger.propagate = False
+
+
+def stop_logging():
+    """Flush queued lines and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_after_fork():
+    """The writer thread does not survive fork; give the child its own queue and thread."""
+    global _listener
+    if _listener is None:
+        return
+    log_queue = queue.Queue(maxsize=_listener.queue.maxsize)
+    _listener = logging.handlers.QueueListener(log_queue, *_listener.handlers)
+    _listener.start()
+    logger.handlers[:] = [DroppingQueueHandler(log_queue)]
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+def stats():
+    return {"dropped": _dropped, "sample_rate": _settings["sample_rate"]}
+
+
+class RequestIdMiddleware:
+    """
+    ASGI middleware giving each request an ID (the caller's X-Request-ID,
+    or a new one) for its log lines, echoed back as X-Request-ID.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex[:16]
+        token = request_id_var.set(request_id)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id_var.reset(token)
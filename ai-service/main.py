@@ -1,19 +1,95 @@
+import time
+
+# Everything after this line counts towards import_seconds in /stats
+BOOT_STARTED = time.perf_counter()
+
 from typing import Union
-from fastapi import FastAPI
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, Header, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-import openai
-import Levenshtein
-import openpyxl
-from difflib import SequenceMatcher
-import difflib
-import pandas as pd
 from pydantic import BaseModel
+from typing import List, Optional
+import asyncio
+import csv
+import io
+import itertools
+import json
+import logging
 import os
-
-from config import OPENAI_API_KEY
-openai.api_key = OPENAI_API_KEY
-
+import secrets
+import tempfile
+
+from config import (
+    ANSWER_TIMEOUT,
+    ANSWER_DEADLINE,
+    CATALOG_PATH,
+    LGAS_PATH,
+    CLINICS_PATH,
+    REFERENCE_SNAPSHOT_PATH,
+    DATA_WATCH_INTERVAL,
+    ADMIN_TOKEN,
+    TYPEAHEAD_MAX_LIMIT,
+    NORMALIZE_MAX_VALUES,
+    NORMALIZE_MIN_SCORE,
+    NORMALIZE_CHUNK_SIZE,
+    NORMALIZE_CSV_MEMORY_BYTES,
+    KNOWLEDGE_DIR,
+    RETRIEVAL_TOP_K,
+    RETRIEVAL_MIN_RELEVANCE,
+    OPENAI_CONTEXT_FALLBACK,
+    ANSWER_CACHE_SIZE,
+    ANSWER_CACHE_TTL,
+    ANSWER_CACHE_PATH,
+    ANSWER_CACHE_SNAPSHOT_INTERVAL,
+    LOOKUP_MEMO_SIZE,
+    BATCH_MAX_ITEMS,
+    BATCH_CONCURRENCY,
+    FAST_PATH_THRESHOLD,
+    STRONG_MODEL,
+    FAST_MODEL,
+    ROUTING_ENABLED,
+    ROUTING_THRESHOLD,
+    ADMISSION_ANSWER_MAX_IN_FLIGHT,
+    ADMISSION_ANSWER_MAX_QUEUE,
+    ADMISSION_BATCH_MAX_IN_FLIGHT,
+    ADMISSION_LOOKUP_MAX_IN_FLIGHT,
+    ADMISSION_LOOKUP_MAX_QUEUE,
+    ADMISSION_QUEUE_TIMEOUT,
+    ADMISSION_RETRY_AFTER,
+    WARM_UP_PRIME_CONNECTIONS,
+    WARM_UP_RETRY_INTERVAL,
+    LOG_LEVEL,
+    LOG_DEBUG_SAMPLE_RATE,
+    LOG_MAX_FIELD_CHARS,
+    LOG_QUEUE_SIZE,
+)
+from admission import AdmissionGate, admission_controlled
+from answer_cache import AnswerCache
+from fast_path import FastPathClassifier
+from language import detect_language
+from llm import get_client, close_client, openai_upstream, prime_connections
+import logs
+from logs import RequestIdMiddleware, log, setup_logging, stop_logging
+from lookup_memo import LookupMemo
+from metrics import (
+    ANSWER_STAGE_LATENCY,
+    MODEL_COMPLETION_LATENCY,
+    MetricsMiddleware,
+    record_token_usage,
+    register_stats,
+    render_metrics,
+    timed_stage,
+)
+from prompts import PROMPT_VERSION, build_system_prompt
+from reference_data import LazyResource, load_reference_data
+from gazetteer import completion_key, state_key
+from lga_normalizer import RESULT_COLUMNS, BulkNormalizer, result_fields
+from reference_snapshot import COMPLETION_KINDS, SnapshotRejected, current_rejection, ensure_snapshot, needs_reload
+from retrieval import build_knowledge_index
+from resilience import UpstreamUnavailable
+from routing import ModelRouter
+from singleflight import SingleFlight
+from streaming import SentinelDetector, sse_event
 from utils import get_context_with_openai
 
 TEMPERATURE = 0.25
@@ -25,6 +101,9 @@ BEST_OF = 1
 FREQUENCY_PENALTY = 0
 PRESENCE_PENALTY = 0
 
+setup_logging(level=LOG_LEVEL, sample_rate=LOG_DEBUG_SAMPLE_RATE,
+              max_field_chars=LOG_MAX_FIELD_CHARS, queue_size=LOG_QUEUE_SIZE)
+
 app = FastAPI()
 
 # Add CORS middleware to allow requests from frontend
@@ -35,37 +114,230 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware, routes=app.routes)
+app.add_middleware(RequestIdMiddleware)
+
+
+def build_index():
+    index = build_knowledge_index(CATALOG_PATH, KNOWLEDGE_DIR)
+    log(logging.INFO, "knowledge_index_ready", passages=len(index))
+    return index
+
+
+# Loaded in the background after startup, or by the first request that needs them
+reference_data = LazyResource(
+    "reference_data", lambda: load_reference_data(LGAS_PATH, CLINICS_PATH, REFERENCE_SNAPSHOT_PATH))
+knowledge_index = LazyResource("knowledge_index", build_index)
+startup_timing = {"import_seconds": round(time.perf_counter() - BOOT_STARTED, 3)}
+
+
+def import_upstream_libraries():
+    import httpx  # noqa: F401
+    import Levenshtein  # noqa: F401
+    import openai  # noqa: F401
+
+
+def preload():
+    """
+    Load what workers can share before the server forks them (gunicorn.conf.py):
+    forked workers inherit the mapped snapshot, the index and the imported libraries.
+    """
+    started = time.perf_counter()
+    reference_data.set(load_reference_data(LGAS_PATH, CLINICS_PATH, REFERENCE_SNAPSHOT_PATH))
+    knowledge_index.set(build_index())
+    import_upstream_libraries()
+    startup_timing["preload_seconds"] = round(time.perf_counter() - started, 3)
+    log(logging.INFO, "preload_complete", **startup_timing)
+
+
+async def warm_up():
+    """Load whatever preload() did not, and open upstream connections; then report ready."""
+    started = time.perf_counter()
+    while True:
+        try:
+            await asyncio.gather(
+                reference_data.get(),
+                knowledge_index.get(),
+                asyncio.to_thread(import_upstream_libraries),
+            )
+            break
+        except Exception as e:
+            log(logging.WARNING, "warm_up_failed", error=str(e), retry_in=WARM_UP_RETRY_INTERVAL, exc_info=True)
+            await asyncio.sleep(WARM_UP_RETRY_INTERVAL)
+
+    # An unreachable upstream does not hold the worker back: lookups still work
+    # and answers degrade through the circuit breaker
+    primed = await prime_connections(WARM_UP_PRIME_CONNECTIONS) if WARM_UP_PRIME_CONNECTIONS > 0 else 0
+    if primed < WARM_UP_PRIME_CONNECTIONS:
+        log(logging.WARNING, "upstream_priming_incomplete", primed=primed, wanted=WARM_UP_PRIME_CONNECTIONS)
+
+    startup_timing["warm_up_seconds"] = round(time.perf_counter() - started, 3)
+    app.state.ready = True
+    log(logging.INFO, "warm_up_complete", primed_connections=primed, **startup_timing)
+
+
+@app.on_event("startup")
+async def start_warm_up():
+    # Serve /health right away; data and libraries load behind it
+    app.state.warm_up = asyncio.create_task(warm_up())
+    startup_timing["startup_seconds"] = round(time.perf_counter() - BOOT_STARTED, 3)
+    log(logging.INFO, "startup_complete", **startup_timing)
+
+
+# Snapshot versions refused by keep_non_empty, so the watcher does not retry them
+rejected_versions = set()
+
+
+def keep_non_empty(new, old):
+    """
+    Refuse a snapshot that would empty a table. Compiling already refuses
+    these; this catches one replaced on disk by hand.
+    """
+    if (new.lga_count or not old.lga_count) and (new.clinic_count or not old.clinic_count):
+        return True
+    rejected_versions.add(new.version)
+    return False
+
+
+async def reload_reference_data(reason):
+    previous = reference_data.value
+    # Compile here so refused CSVs are reported rather than the current snapshot re-mapped
+    try:
+        await asyncio.to_thread(ensure_snapshot, LGAS_PATH, CLINICS_PATH, REFERENCE_SNAPSHOT_PATH)
+        rejection = current_rejection(REFERENCE_SNAPSHOT_PATH, LGAS_PATH, CLINICS_PATH)
+    except SnapshotRejected as e:
+        rejection = {"version": e.version, "tables": e.tables}
+    if rejection:
+        log(logging.WARNING, "resource_reload_rejected", resource="reference_data", reason=reason,
+            version=rejection["version"], tables=rejection["tables"])
+        return False, previous, previous
+    swapped = await reference_data.reload(accept=keep_non_empty)
+    current = reference_data.value
+    if swapped:
+        log(logging.INFO, "reference_data_reloaded", reason=reason,
+            previous_version=previous.version if previous else None, **current.stats())
+    return swapped, previous, current
+
+
+async def watch_reference_data():
+    """Reload the reference data when the CSVs or the compiled snapshot change."""
+    while True:
+        await asyncio.sleep(DATA_WATCH_INTERVAL)
+        try:
+            if reference_data.ready and await asyncio.to_thread(
+                    needs_reload, reference_data.value, LGAS_PATH, CLINICS_PATH, skip_versions=rejected_versions):
+                await reload_reference_data("file_changed")
+        except Exception as e:
+            log(logging.WARNING, "reference_data_reload_failed", error=str(e), exc_info=True)
+
+
+@app.on_event("startup")
+async def start_data_watch():
+    if DATA_WATCH_INTERVAL > 0:
+        app.state.data_watch = asyncio.create_task(watch_reference_data())
+
+
+answer_cache = AnswerCache(max_size=ANSWER_CACHE_SIZE, ttl=ANSWER_CACHE_TTL)
+# Lookup results per normalized input, emptied when the reference data changes
+lookup_memos = {name: LookupMemo(max_size=LOOKUP_MEMO_SIZE) for name in ("predict_lga", "refer_to_clinic", "towns")}
+# Identical questions asked at the same time share one upstream call
+answer_flights = SingleFlight()
+# Goodbyes and off-topic messages answered without the model
+fast_path = FastPathClassifier(threshold=FAST_PATH_THRESHOLD)
+# Simple factual questions go to the cheaper model
+model_router = ModelRouter(
+    fast_model=FAST_MODEL,
+    strong_model=STRONG_MODEL,
+    threshold=ROUTING_THRESHOLD,
+    min_relevance=RETRIEVAL_MIN_RELEVANCE,
+    enabled=ROUTING_ENABLED,
+)
+
+
+def _gate(name, max_in_flight, max_queue):
+    return AdmissionGate(name, max_in_flight, max_queue,
+                         queue_timeout=ADMISSION_QUEUE_TIMEOUT, retry_after=ADMISSION_RETRY_AFTER)
+
+
+# Separate budgets so an LLM brownout cannot starve the cheap lookup endpoints
+admission_gates = {
+    "answer": _gate("answer", ADMISSION_ANSWER_MAX_IN_FLIGHT, ADMISSION_ANSWER_MAX_QUEUE),
+    "answer_batch": _gate("answer_batch", ADMISSION_BATCH_MAX_IN_FLIGHT, 0),
+    "predict_lga": _gate("predict_lga", ADMISSION_LOOKUP_MAX_IN_FLIGHT, ADMISSION_LOOKUP_MAX_QUEUE),
+    "refer_to_clinic": _gate("refer_to_clinic", ADMISSION_LOOKUP_MAX_IN_FLIGHT, ADMISSION_LOOKUP_MAX_QUEUE),
+    "get_town_from_lga": _gate("get_town_from_lga", ADMISSION_LOOKUP_MAX_IN_FLIGHT, ADMISSION_LOOKUP_MAX_QUEUE),
+    "typeahead": _gate("typeahead", ADMISSION_LOOKUP_MAX_IN_FLIGHT, ADMISSION_LOOKUP_MAX_QUEUE),
+    "normalize_lgas": _gate("normalize_lgas", ADMISSION_BATCH_MAX_IN_FLIGHT, 0),
+}
+
+
+# Component counters, read on each /metrics scrape
+register_stats("answer_cache", answer_cache.stats, counters=("hits", "misses", "evictions"))
+register_stats("lookup_memo", lambda: {name: memo.stats() for name, memo in lookup_memos.items()},
+               counters=("hits", "misses", "evictions", "invalidations"), label="lookup")
+register_stats("answer_singleflight", answer_flights.stats, counters=("executions", "coalesced"))
+register_stats("fast_path", fast_path.stats, counters=("checked", "complete", "no_answer", "upstream_calls_saved"))
+register_stats("model_routing", lambda: {model: {"decisions": count}
+                                         for model, count in model_router.stats()["decisions"].items()},
+               counters=("decisions",), label="model")
+register_stats("admission", lambda: {name: gate.stats() for name, gate in admission_gates.items()},
+               counters=("admitted", "rejected_queue_full", "rejected_timeout"), label="gate")
+register_stats("logging", logs.stats, counters=("dropped",))
+register_stats("upstream", lambda: {**openai_upstream.stats(), "breaker_open": openai_upstream.breaker.state != "closed"},
+               counters=("trips", "calls", "failures", "timeouts", "short_circuited", "hedges_launched", "hedges_won"))
+
+
+def save_answer_cache():
+    try:
+        saved = answer_cache.save(ANSWER_CACHE_PATH)
+        log(logging.INFO, "answer_cache_saved", entries=saved)
+    except Exception as e:
+        log(logging.WARNING, "answer_cache_save_failed", error=str(e))
+
+
+async def snapshot_answer_cache():
+    while True:
+        await asyncio.sleep(ANSWER_CACHE_SNAPSHOT_INTERVAL)
+        save_answer_cache()
+
+
+@app.on_event("startup")
+async def load_answer_cache():
+    if os.path.exists(ANSWER_CACHE_PATH):
+        try:
+            loaded = answer_cache.load(ANSWER_CACHE_PATH)
+            log(logging.INFO, "answer_cache_loaded", entries=loaded)
+        except Exception as e:
+            log(logging.WARNING, "answer_cache_load_failed", error=str(e))
+    if ANSWER_CACHE_SNAPSHOT_INTERVAL > 0:
+        app.state.answer_cache_snapshot = asyncio.create_task(snapshot_answer_cache())
 
-# Load data files with error handling
-try:
-    file_path = './data/partner_clinic.xlsx'
-    workbook = openpyxl.load_workbook(file_path)
-except Exception as e:
-    print(f"Warning: Could not load clinic data: {e}")
-    workbook = None
-
-try:
-    lgas = pd.read_csv("./data/lgas.csv", sep=",")
-except Exception as e:
-    print(f"Warning: Could not load LGAs data: {e}")
-    lgas = pd.DataFrame()
-
-try:
-    clinics_df = pd.read_csv("./data/clinics.csv").fillna("")
-except Exception as e:
-    print(f"Warning: Could not load clinics data: {e}")
-    clinics_df = pd.DataFrame()
-
-
-def gpt_without_functions(model="gpt-4o",
-                          stream=False,
-                          messages=None,
-                          temperature=TEMPERATURE,
-                          stop=STOP_SEQUENCES):
-    """ GPT model without function call. Old SDK style. """
+
+@app.on_event("shutdown")
+async def shutdown_openai_client():
+    await close_client()
+
+
+@app.on_event("shutdown")
+async def shutdown_answer_cache():
+    snapshot = getattr(app.state, "answer_cache_snapshot", None)
+    if snapshot is not None:
+        snapshot.cancel()
+    save_answer_cache()
+    # Last, so the lines above are flushed
+    stop_logging()
+
+
+async def gpt_without_functions(model="gpt-4o",
+                                stream=False,
+                                messages=None,
+                                temperature=TEMPERATURE,
+                                stop=STOP_SEQUENCES,
+                                timeout=ANSWER_TIMEOUT):
+    """ GPT model without function call, on the shared async client. """
     if messages is None:
         messages = []
-    return openai.ChatCompletion.create(
+    return await get_client().chat.completions.create(
         model=model,
         messages=messages,
         temperature=temperature,
@@ -74,102 +346,195 @@ def gpt_without_functions(model="gpt-4o",
         frequency_penalty=FREQUENCY_PENALTY,
         presence_penalty=PRESENCE_PENALTY,
         stream=stream,
-        stop=stop
+        stop=stop,
+        timeout=timeout
     )
 
 
-def clean_text(text):
-    text = text.replace("-", " ")
-    text = text.replace("/", " ")
-    text = text.replace("'", "")
-    text = text.replace("(", "")
-    text = text.replace(")", "")
-    return text.lower()
-
-
-def get_top_n_similar_strings_by_levenshtein(strings, user_input, n=3):
-    result = []
-    for string in strings:
-        if clean_text(user_input) in clean_text(string).split():
-            result.append(string)
-    if result:
-        n = max(0, n - len(result))
-    similarity_scores = [
-        (string, Levenshtein.distance(clean_text(string), clean_text(user_input)))
-        for string in strings if string not in result
-    ]
-    similarity_scores.sort(key=lambda x: x[1])
-    top_n_similar_strings = similarity_scores[:n]
-    return result + [item[0] for item in top_n_similar_strings]
+async def get_context(query):
+    """
+    Top-k passages from the local knowledge index, with the best relevance (0 to 1).
+    Falls back to the OpenAI context call only when enabled and nothing matched.
+    """
+    index = await knowledge_index.get()
+    hits = index.search(query, k=RETRIEVAL_TOP_K)
+    best_relevance = max((relevance for _, relevance in hits), default=0.0)
+    passages = [passage for passage, relevance in hits if relevance >= RETRIEVAL_MIN_RELEVANCE]
+    if passages:
+        return "\n\n".join(passages), best_relevance
+    if OPENAI_CONTEXT_FALLBACK:
+        return await get_context_with_openai(query=query), best_relevance
+    return "data not available", best_relevance
 
 
-PROMPT = """
-You are a smart AI assistant that helps people answer questions about family planning methods. You must answer only in the user's own language or dialect: English, Nigerian Pidgin, Yoruba, Hausa, or Igbo.
+@app.get("/")
+def read_root():
+    return {"message": "Family Planning AI Service is running"}
 
-Goals
-- Always reply in the same language or dialect the user used. Do not switch to English unless the user used English.
-- Be kind and empathetic. Use a friendly tone suited to the chosen language or dialect.
-- Keep answers short, 3 to 5 sentences.
-- Handle misspellings, slang, and mixed wording. If the user mixes languages, choose the predominant one. If a local term lacks an easy equivalent, keep the English term but keep the rest of the answer in the user's language.
-- Do not ask follow-up questions.
 
-What you can answer
-- Family planning, contraceptives, and sexual health.
+@app.get("/health")
+def health_check():
+    return {"status": "ok", "service": "Family Planning AI"}
 
-Special outputs
-- If you cannot answer from the provided DATA and general knowledge of family planning, output exactly: NO ANSWER
-- If the question is unrelated to sexual health or family planning, output exactly: NO ANSWER
-- If the user clearly says they have no more questions, output exactly: COMPLETE
 
-Thinking rule
-- You may think in any language internally, but your final output must be only in the user's language. Do not explain your reasoning.
+@app.get("/ready")
+def readiness_check():
+    """503 until this worker has its data, index and upstream connections (see warm_up)."""
+    if not getattr(app.state, "ready", False):
+        return JSONResponse(status_code=503, content={"status": "warming_up", "service": "Family Planning AI"})
+    return {"status": "ready", "service": "Family Planning AI"}
+
+
+@app.get("/dataset")
+async def dataset_version(request: Request):
+    """Version of the reference data this worker serves, also sent as ETag."""
+    data = await reference_data.get()
+    etag = f'"{data.version}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return JSONResponse(content=data.stats(), headers={"ETag": etag})
+
+
+@app.post("/admin/reload")
+async def admin_reload(x_admin_token: Optional[str] = Header(None)):
+    """
+    Rebuild the reference data from the CSVs now and swap it in.
+    Other workers pick the new snapshot up on their next watch check.
+    """
+    if not ADMIN_TOKEN or not secrets.compare_digest(x_admin_token or "", ADMIN_TOKEN):
+        return JSONResponse(status_code=403, content={"error": "Admin token missing or invalid"})
+    try:
+        swapped, previous, current = await reload_reference_data("admin")
+    except Exception as e:
+        log(logging.ERROR, "endpoint_failed", endpoint="/admin/reload", error=str(e), exc_info=True)
+        return JSONResponse(status_code=500, content={"error": str(e)})
+    return JSONResponse(
+        status_code=200 if swapped else 409,
+        content={"reloaded": swapped, "previous_version": previous.version if previous else None,
+                 "version": current.version},
+        headers={"ETag": f'"{current.version}"'},
+    )
 
-Style and length
-- 3 to 5 sentences. Clear and reassuring. No extra headers or lists.
 
-DATA
-Use the following as factual context in addition to general knowledge:
-`{context}`
+@app.get("/stats")
+def stats():
+    return {
+        "answer_cache": answer_cache.stats(),
+        "lookup_memo": {name: memo.stats() for name, memo in lookup_memos.items()},
+        "answer_singleflight": answer_flights.stats(),
+        "fast_path": fast_path.stats(),
+        "model_routing": model_router.stats(),
+        "admission": {name: gate.stats() for name, gate in admission_gates.items()},
+        "upstream": openai_upstream.stats(),
+        "reference_data": reference_data.value.stats() if reference_data.ready else None,
+        "startup": {**startup_timing, "reference_data": reference_data.stats(),
+                    "knowledge_index": knowledge_index.stats()},
+    }
 
-Examples
-User: What is Postinor?
-Assistant: Postinor is an emergency contraceptive pill that helps prevent pregnancy after unprotected sex. It works best if taken within 72 hours. It is for emergencies, not regular family planning.
 
-User: Wetin be Postinor?
-Assistant: Postinor na emergency contraceptive wey fit stop belle after unprotected sex. E dey work pass if you take am within 72 hours. No be everyday family planning, na for emergency.
+@app.get("/metrics")
+def metrics():
+    """Prometheus scrape endpoint."""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
 
-User: Kini Postinor?
-Assistant: Postinor oogun pajawiri ni fun idena oyun lẹyin ibalopọ lai aabo. O maa n ṣiṣẹ dara julọ ti a ba mu un laarin wakati 72. Kii ṣe fun lilo lojoojumọ, fun pajawiri nikan.
 
-User: Menene Postinor?
-Assistant: Postinor maganin kariya ne na gaggawa don hana ɗaukar ciki bayan jima'i ba tare da kariya ba. Yana aiki sosai idan an sha shi cikin awa 72. Ba a amfani da shi kullum, na gaggawa ne kawai.
+class GPTRequest(BaseModel):
+    memory: dict
 
-User: Gịnị bụ Postinor?
-Assistant: Postinor bụ ọgwụ mberede iji gbochie ime mgbe e nwere mmekọahụ na-enweghị nchebe. Ọ na-arụ ọrụ nke ọma ma a ṅụọ ya n'ime awa 72. Ọ bụghị maka ojoo kwa ụbọchị, maka mberede ka ọ dị.
 
-User: No more questions
-Assistant: COMPLETE
+ANSWER_ERROR_MESSAGE = "I apologize, but I'm having trouble processing your question right now. Please try again."
 
-User: What colour is the sky?
-Assistant: NO ANSWER
-"""
 
+async def prepare_answer(user_question, language):
+    """Retrieve context, route to a model and build the messages for one question."""
+    # Get context from data or general knowledge
+    with timed_stage("context"):
+        try:
+            context, relevance = await get_context(user_question)
+        except Exception as e:
+            log(logging.WARNING, "context_failed", error=str(e))
+            context, relevance = "data not available", 0.0
+
+    with timed_stage("prompt"):
+        model, _ = model_router.route(user_question, language, relevance)
+        system_content = build_system_prompt(language, context)
+        return model, [
+            {'role': 'system', 'content': system_content},
+            {'role': 'user', 'content': user_question},
+        ]
 
-@app.get("/")
-def read_root():
-    return {"message": "Family Planning AI Service is running"}
 
+async def complete_answer(user_question, language, cache_key):
+    model, messages = await prepare_answer(user_question, language)
+    # Call GPT without prior assistant turns
+    started = time.perf_counter()
+    with timed_stage("completion"):
+        response = await openai_upstream.call(
+            lambda: gpt_without_functions(model=model, stream=False, messages=messages),
+            deadline=ANSWER_DEADLINE,
+            hedge=True,
+        )
+    elapsed = time.perf_counter() - started
+    model_router.record_latency(model, elapsed)
+    MODEL_COMPLETION_LATENCY.labels(model).observe(elapsed)
+    record_token_usage(model, response.usage)
+    response_message = response.choices[0].message.content.strip()
+    answer_cache.set(cache_key, response_message)
+    return response_message
 
-@app.get("/health")
-def health_check():
-    return {"status": "ok", "service": "Family Planning AI"}
 
+async def answer_from_memory(memory):
+    """Answer memory["user"] locally, from the cache, or through one shared upstream call."""
+    user_question = memory["user"]
+    sentinel = fast_path.classify(user_question)
+    if sentinel:
+        return sentinel
 
-class GPTRequest(BaseModel):
-    memory: dict
+    language = memory.get("language") or detect_language(user_question)
+
+    cache_key = AnswerCache.make_key(user_question, language, PROMPT_VERSION)
+    cached = answer_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    return await answer_flights.do(
+        cache_key, lambda: complete_answer(user_question, language, cache_key))
+
+
+DEGRADED_MESSAGE = ("We are receiving a lot of questions right now. Please try again in a few minutes, "
+                    "or call 7790 to speak with a nurse counselor.")
+
+
+def degraded_answer_text(memory):
+    """Best answer available without the model: fast path, then cache, then a canned message."""
+    user_question = memory.get("user")
+    if not user_question:
+        return DEGRADED_MESSAGE
+    # Not classify(): shed and failed requests are not upstream calls the fast path saved
+    sentinel = fast_path.sentinel_for(user_question)
+    if sentinel:
+        return sentinel
+    language = memory.get("language") or detect_language(user_question)
+    cached = answer_cache.get(AnswerCache.make_key(user_question, language, PROMPT_VERSION))
+    return cached or DEGRADED_MESSAGE
+
+
+def degraded_answer(request):
+    return JSONResponse(content={"response": degraded_answer_text(request.memory), "degraded": True})
+
+
+def degraded_answer_stream(request):
+    response_message = degraded_answer_text(request.memory)
+    return StreamingResponse(
+        iter([sse_event("done", {"response": response_message, "degraded": True})]),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
 
 
 @app.post("/answer/", tags=["answer"])
+@admission_controlled(admission_gates["answer"], on_reject=degraded_answer)
 async def answer(request: GPTRequest):
     try:
         memory = request.memory
@@ -180,65 +545,207 @@ async def answer(request: GPTRequest):
                 content={"error": "Missing 'user' field in memory object"}
             )
         
-        user_question = memory["user"]
-        
-        # Get context from data or general knowledge
-        try:
-            context = await get_context_with_openai(query=user_question)
-        except Exception as e:
-            print(f"Warning: Could not get context: {e}")
-            context = "data not available"
+        response_message = await answer_from_memory(memory)
+        with timed_stage("serialization"):
+            return JSONResponse(content={"response": response_message})
+
+    except UpstreamUnavailable as e:
+        log(logging.WARNING, "answer_degraded", endpoint="/answer/", error=str(e))
+        return JSONResponse(content={"response": degraded_answer_text(memory), "degraded": True})
 
-        # Strong language lock
-        system_content = (
-            "IMPORTANT: Reply only in the user's language. Do not use English unless the user did.\n\n"
-            + PROMPT.format(context=context)
+    except Exception as e:
+        log(logging.ERROR, "endpoint_failed", endpoint="/answer/", error=str(e), exc_info=True)
+        return JSONResponse(
+            status_code=500,
+            content={"error": str(e), "response": ANSWER_ERROR_MESSAGE}
         )
 
-        # Call GPT without prior assistant turns
-        response = gpt_without_functions(
-            model='gpt-4o',
-            stream=False,
-            messages=[
-                {'role': 'system', 'content': system_content},
-                {'role': 'user', 'content': user_question},
-            ],
+
+async def stream_answer_events(user_question, language, cache_key):
+    sentinel = fast_path.classify(user_question)
+    if sentinel:
+        yield sse_event("done", {"response": sentinel})
+        return
+
+    cached = answer_cache.get(cache_key)
+    if cached is not None:
+        yield sse_event("token", {"token": cached})
+        yield sse_event("done", {"response": cached})
+        return
+
+    try:
+        model, messages = await prepare_answer(user_question, language)
+        started = time.perf_counter()
+        # The deadline covers opening the stream; tokens are forwarded as they come
+        stream = await openai_upstream.call(
+            lambda: gpt_without_functions(model=model, stream=True, messages=messages),
+            deadline=ANSWER_DEADLINE,
         )
-        response_message = response.choices[0].message.content.strip()
-        return JSONResponse(content={"response": response_message})
-    
+        detector = SentinelDetector()
+        parts = []
+        try:
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                token = chunk.choices[0].delta.content or ""
+                text = detector.feed(token)
+                if detector.sentinel:
+                    # No need to wait for the rest of the completion
+                    break
+                if text:
+                    parts.append(text)
+                    yield sse_event("token", {"token": text})
+        finally:
+            # Also when the client disconnects or the stream fails, so the
+            # pooled connection is released now rather than at garbage collection
+            await stream.response.aclose()
+        tail = detector.flush()
+        if tail:
+            parts.append(tail)
+            yield sse_event("token", {"token": tail})
+
+        elapsed = time.perf_counter() - started
+        model_router.record_latency(model, elapsed)
+        MODEL_COMPLETION_LATENCY.labels(model).observe(elapsed)
+        # Streamed completions carry no usage block, so only the time is recorded
+        ANSWER_STAGE_LATENCY.labels("completion").observe(elapsed)
+        response_message = detector.sentinel or "".join(parts).strip()
+        answer_cache.set(cache_key, response_message)
+        yield sse_event("done", {"response": response_message})
+
+    except UpstreamUnavailable as e:
+        log(logging.WARNING, "answer_degraded", endpoint="/answer/stream/", error=str(e))
+        yield sse_event("done", {"response": degraded_answer_text({"user": user_question, "language": language}),
+                                 "degraded": True})
+
     except Exception as e:
-        print(f"Error in /answer/ endpoint: {e}")
+        log(logging.ERROR, "endpoint_failed", endpoint="/answer/stream/", error=str(e), exc_info=True)
+        yield sse_event("error", {"error": str(e), "response": ANSWER_ERROR_MESSAGE})
+
+
+@app.post("/answer/stream/", tags=["answer"])
+@admission_controlled(admission_gates["answer"], on_reject=degraded_answer_stream)
+async def answer_stream(request: GPTRequest):
+    """
+    Same as /answer/ but streamed as server-sent events:
+    'token' events carry text as it arrives, a final 'done' event carries the
+    full response (exactly COMPLETE or NO ANSWER for the special outputs),
+    and 'error' replaces 'done' if the completion fails.
+    """
+    memory = request.memory
+    if "user" not in memory:
         return JSONResponse(
-            status_code=500,
-            content={"error": str(e), "response": "I apologize, but I'm having trouble processing your question right now. Please try again."}
+            status_code=400,
+            content={"error": "Missing 'user' field in memory object"}
         )
 
+    user_question = memory["user"]
+    language = memory.get("language") or detect_language(user_question)
+    cache_key = AnswerCache.make_key(user_question, language, PROMPT_VERSION)
+    return StreamingResponse(
+        stream_answer_events(user_question, language, cache_key),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+class BatchGPTRequest(BaseModel):
+    memories: List[dict]
+    concurrency: Optional[int] = None
+    stream: bool = False
+
+
+async def answer_batch_item(index, memory, semaphore):
+    if "user" not in memory:
+        return {"index": index, "error": "Missing 'user' field in memory object"}
+    async with semaphore:
+        try:
+            return {"index": index, "response": await answer_from_memory(memory)}
+        except UpstreamUnavailable as e:
+            return {"index": index, "error": str(e), "response": degraded_answer_text(memory), "degraded": True}
+        except Exception as e:
+            log(logging.ERROR, "endpoint_failed", endpoint="/answer/batch/", item=index, error=str(e), exc_info=True)
+            return {"index": index, "error": str(e), "response": ANSWER_ERROR_MESSAGE}
+
+
+@app.post("/answer/batch/", tags=["answer"])
+@admission_controlled(admission_gates["answer_batch"])
+async def answer_batch(request: BatchGPTRequest):
+    """
+    Answer many memory objects with at most `concurrency` upstream calls at once.
+    Results come back in request order, or as JSON lines in completion order
+    when `stream` is true (each line carries its `index`).
+    """
+    if len(request.memories) > BATCH_MAX_ITEMS:
+        return JSONResponse(
+            status_code=400,
+            content={"error": f"Batch too large, at most {BATCH_MAX_ITEMS} memories per request"}
+        )
+
+    concurrency = min(request.concurrency or BATCH_CONCURRENCY, BATCH_CONCURRENCY)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    tasks = [
+        asyncio.ensure_future(answer_batch_item(index, memory, semaphore))
+        for index, memory in enumerate(request.memories)
+    ]
+
+    if not request.stream:
+        return JSONResponse(content={"responses": await asyncio.gather(*tasks)})
+
+    async def stream_results():
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield json.dumps(await task, ensure_ascii=False) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
+def memoized(name, data, key, compute):
+    """compute() for key, reused until the reference data changes version."""
+    memo = lookup_memos[name]
+    value = memo.get(data.version, key)
+    if value is None:
+        value = compute()
+        memo.set(data.version, key, value)
+    return value
+
 
 class LGARequest(BaseModel):
     user_input: str
+    state: Optional[str] = None
 
 
 @app.post("/predict_lga/", tags=["predict_lga"])
+@admission_controlled(admission_gates["predict_lga"])
 async def predict_lga(request: LGARequest):
     try:
         user_input = request.user_input
-        
-        if lgas.empty:
+        data = await reference_data.get()
+
+        if not data.lga_count:
             return JSONResponse(content={"response": [], "message": "LGA data not available"})
-        
-        lga2state = {}
-        for _, row in lgas.iterrows():
-            lga2state[row["LGA"]] = row["State"]
-        
-        print(f"Number of lga states: {len(lga2state.keys())}")
 
-        response_message = get_top_n_similar_strings_by_levenshtein(
-            lga2state.keys(), user_input, n=5)
-        return JSONResponse(content={"response": response_message})
+        state = request.state if request.state and request.state.strip() else None
+        log(logging.DEBUG, "lga_lookup", sample=True, user_input=user_input, state=state, lgas=data.lga_count)
+
+        content = {}
+        if state is not None and not data.gazetteer.has_state(state):
+            content["message"] = f"Unknown state '{state}', searched all LGAs"
+            state = None
+
+        matches = memoized("predict_lga", data, (completion_key(user_input), state_key(state) if state else ""),
+                           lambda: data.gazetteer.closest(user_input, n=5, state=state))
+        # The same name in two states is listed once here; matches tells them apart
+        content["response"] = list(dict.fromkeys(name for name, _, _ in matches))
+        content["matches"] = [{"lga": name, "state": lga_state, "score": score}
+                              for name, lga_state, score in matches]
+        return JSONResponse(content=content)
     
     except Exception as e:
-        print(f"Error in /predict_lga/ endpoint: {e}")
+        log(logging.ERROR, "endpoint_failed", endpoint="/predict_lga/", error=str(e), exc_info=True)
         return JSONResponse(
             status_code=500,
             content={"error": str(e), "response": []}
@@ -250,42 +757,42 @@ class ClinicRequest(BaseModel):
     city: str
 
 
+def clinic_referral_text(data, lga, city):
+    text = ""
+    for name, row_lga, town, address, landmark in data.clinics_in(lga, city):
+        text += (
+            f"📓 Clinic Name: {name}\n"
+            f"📍 Address: {row_lga}, {town}, {address}"
+        )
+        if landmark.strip():
+            text += f"\n✨Popular Landmark: {landmark}\n\n"
+        else:
+            text += "\n\n"
+    return text
+
+
 @app.post("/refer_to_clinic/", tags=["refer_to_clinic"])
+@admission_controlled(admission_gates["refer_to_clinic"])
 async def refer_to_clinic(request: ClinicRequest):
     try:
         lga = request.lga
         city = request.city
-        
-        print('!!! Clinic suggestion LGA:', lga)
-        print('!!! Clinic suggestion city:', city)
+        data = await reference_data.get()
 
-        if clinics_df.empty:
+        if not data.clinic_count:
             return JSONResponse(content={"response": "Clinic data not available", "status": "empty"})
 
-        text = ""
-        subset = clinics_df[
-            (clinics_df["Town/City"].str.lower() == city.lower()) &
-            (clinics_df["LGA"].str.lower() == lga.lower())
-        ]
+        text = memoized("refer_to_clinic", data, (lga.lower(), city.lower()),
+                        lambda: clinic_referral_text(data, lga, city))
 
-        for _, row in subset.iterrows():
-            text += (
-                f"📓 Clinic Name: {row['Clinic name']}\n"
-                f"📍 Address: {row['LGA']}, {row['Town/City']}, {row['Address']}"
-            )
-            if isinstance(row['Popular Landmark'], str) and row['Popular Landmark'].strip():
-                text += f"\n✨Popular Landmark: {row['Popular Landmark']}\n\n"
-            else:
-                text += "\n\n"
-
-        print('!!! Clinic suggestion:', text)
+        log(logging.DEBUG, "clinic_suggestion", sample=True, lga=lga, city=city, text=text)
         if text:
             return JSONResponse(content={"response": text})
         else:
             return JSONResponse(content={"response": "EMPTY"})
     
     except Exception as e:
-        print(f"Error in /refer_to_clinic/ endpoint: {e}")
+        log(logging.ERROR, "endpoint_failed", endpoint="/refer_to_clinic/", error=str(e), exc_info=True)
         return JSONResponse(
             status_code=500,
             content={"error": str(e), "response": "Error fetching clinic information"}
@@ -296,23 +803,25 @@ class TownRequest(BaseModel):
     lga: str
 
 
+def towns_in_lga(data, lga):
+    """Distinct non-empty towns of the clinics in lga, sorted."""
+    return memoized("towns", data, lga.lower(),
+                    lambda: sorted(set(town for town in data.towns_in(lga) if town.strip())))
+
+
 @app.post("/get_town_from_lga/", tags=["get_town_from_lga"])
+@admission_controlled(admission_gates["get_town_from_lga"])
 async def get_town_from_lga(request: TownRequest):
     try:
         lga = request.lga
-        print('!!! Town suggestion per LGA:', lga)
+        data = await reference_data.get()
 
-        if clinics_df.empty:
+        if not data.clinic_count:
             return JSONResponse(content={"response": [], "status": "empty"})
 
-        cities = []
-        for _, row in clinics_df[clinics_df["LGA"].str.lower() == lga.lower()].iterrows():
-            if isinstance(row['Town/City'], str) and row['Town/City'].strip():
-                cities.append(row['Town/City'])
-
-        print('!!! Cities suggestion:', cities)
+        cities = towns_in_lga(data, lga)
 
-        cities = sorted(list(set(cities)))
+        log(logging.DEBUG, "town_suggestion", sample=True, lga=lga, cities=cities)
 
         if cities:
             return JSONResponse(content={"response": cities})
@@ -320,7 +829,7 @@ async def get_town_from_lga(request: TownRequest):
             return JSONResponse(content={"response": "EMPTY"})
     
     except Exception as e:
-        print(f"Error in /get_town_from_lga/ endpoint: {e}")
+        log(logging.ERROR, "endpoint_failed", endpoint="/get_town_from_lga/", error=str(e), exc_info=True)
         return JSONResponse(
             status_code=500,
             content={"error": str(e), "response": []}
@@ -328,22 +837,18 @@ async def get_town_from_lga(request: TownRequest):
 
 
 @app.post("/get_town_from_lga_messenger/", tags=["get_town_from_lga_messenger"])
+@admission_controlled(admission_gates["get_town_from_lga"])
 async def get_town_from_lga_messenger(request: TownRequest):
     try:
         lga = request.lga
-        print('!!! Town suggestion per LGA:', lga)
+        data = await reference_data.get()
 
-        if clinics_df.empty:
+        if not data.clinic_count:
             return JSONResponse(content={"town": [], "town_text": "EMPTY"})
 
-        cities = []
-        for _, row in clinics_df[clinics_df["LGA"].str.lower() == lga.lower()].iterrows():
-            if isinstance(row['Town/City'], str) and row['Town/City'].strip():
-                cities.append(row['Town/City'])
+        cities = towns_in_lga(data, lga)
 
-        print('!!! Cities suggestion:', cities)
-
-        cities = sorted(list(set(cities)))
+        log(logging.DEBUG, "town_suggestion", sample=True, lga=lga, cities=cities)
 
         if cities:
             cities_text = ""
@@ -354,13 +859,184 @@ async def get_town_from_lga_messenger(request: TownRequest):
             return JSONResponse(content={"town": "EMPTY", "town_text": "EMPTY"})
     
     except Exception as e:
-        print(f"Error in /get_town_from_lga_messenger/ endpoint: {e}")
+        log(logging.ERROR, "endpoint_failed", endpoint="/get_town_from_lga_messenger/", error=str(e), exc_info=True)
         return JSONResponse(
             status_code=500,
             content={"error": str(e), "town": [], "town_text": ""}
         )
 
 
+class TypeaheadRequest(BaseModel):
+    prefix: str
+    limit: int = 10
+    kind: Optional[str] = None
+
+
+@app.post("/typeahead/", tags=["typeahead"])
+@admission_controlled(admission_gates["typeahead"])
+async def typeahead(request: TypeaheadRequest):
+    """
+    LGA and town names starting with prefix, or with a later word starting
+    with it, for completion as the user types. Whole-name matches first,
+    then alphabetical. kind limits the results to "lga" or "town".
+    """
+    if request.kind is not None and request.kind not in COMPLETION_KINDS:
+        return JSONResponse(
+            status_code=400,
+            content={"error": f"kind must be one of {', '.join(COMPLETION_KINDS)}", "response": []}
+        )
+    try:
+        data = await reference_data.get()
+        prefix = completion_key(request.prefix)
+        limit = max(0, min(request.limit, TYPEAHEAD_MAX_LIMIT))
+        if not prefix or not limit:
+            return JSONResponse(content={"response": []})
+
+        kinds = COMPLETION_KINDS if request.kind is None else (request.kind,)
+        found = sorted((*row, kind) for kind in kinds for row in data.completions(kind, prefix, limit))
+        response = []
+        for _, _, name, lga, state, kind in found[:limit]:
+            item = {"name": name, "type": kind, "state": state}
+            if kind == "town":
+                item["lga"] = lga
+            response.append(item)
+        return JSONResponse(content={"response": response})
+
+    except Exception as e:
+        log(logging.ERROR, "endpoint_failed", endpoint="/typeahead/", error=str(e), exc_info=True)
+        return JSONResponse(
+            status_code=500,
+            content={"error": str(e), "response": []}
+        )
+
+
+class LgaValue(BaseModel):
+    value: str
+    state: Optional[str] = None
+
+
+class NormalizeLgasRequest(BaseModel):
+    values: List[Union[str, LgaValue]]
+    state: Optional[str] = None
+
+
+@app.post("/normalize_lgas/", tags=["normalize_lgas"])
+@admission_controlled(admission_gates["normalize_lgas"])
+async def normalize_lgas(request: NormalizeLgasRequest):
+    """
+    Canonical LGA, state and score for each raw value, in request order.
+    A value is a string or {"value", "state"}; state defaults to the
+    request's. Each distinct value is matched once.
+    """
+    if len(request.values) > NORMALIZE_MAX_VALUES:
+        return JSONResponse(
+            status_code=400,
+            content={"error": f"Too many values, at most {NORMALIZE_MAX_VALUES} per request", "response": []}
+        )
+    try:
+        data = await reference_data.get()
+        if not data.lga_count:
+            return JSONResponse(content={"response": [], "message": "LGA data not available"})
+
+        rows = [(item, request.state) if isinstance(item, str) else (item.value, item.state or request.state)
+                for item in request.values]
+        normalizer = BulkNormalizer(data.gazetteer, NORMALIZE_MIN_SCORE)
+        matches = []
+        # A chunk per thread call, so a large batch does not hold one of the pool's threads throughout
+        for start in range(0, len(rows), NORMALIZE_CHUNK_SIZE):
+            matches += await asyncio.to_thread(normalizer.normalize, rows[start:start + NORMALIZE_CHUNK_SIZE])
+        response = [{"input": value, "lga": match[0] if match else None,
+                     "state": match[1] if match else None, "score": match[2] if match else 0.0}
+                    for (value, _), match in zip(rows, matches)]
+        log(logging.INFO, "lgas_normalized", rows=len(rows), distinct=len(normalizer.matches))
+        return JSONResponse(content={"response": response, "distinct": len(normalizer.matches)})
+
+    except Exception as e:
+        log(logging.ERROR, "endpoint_failed", endpoint="/normalize_lgas/", error=str(e), exc_info=True)
+        return JSONResponse(
+            status_code=500,
+            content={"error": str(e), "response": []}
+        )
+
+
+@app.post("/normalize_lgas/csv/", tags=["normalize_lgas"])
+@admission_controlled(admission_gates["normalize_lgas"])
+async def normalize_lgas_csv(request: Request, column: str = "selected_lga", state_column: str = "selected_state"):
+    """
+    A CSV upload back with lga_match, state_match and score appended to
+    each row. The upload is read in full first (spooled to disk past
+    NORMALIZE_CSV_MEMORY_BYTES); the answer is then streamed
+    NORMALIZE_CHUNK_SIZE rows at a time.
+    """
+    body = tempfile.SpooledTemporaryFile(max_size=NORMALIZE_CSV_MEMORY_BYTES)
+    try:
+        data = await reference_data.get()
+        if not data.lga_count:
+            body.close()
+            return JSONResponse(content={"response": [], "message": "LGA data not available"})
+
+        # Before the response starts: once it does, Starlette reads the
+        # request's receive channel itself to watch for a disconnect
+        async for chunk in request.stream():
+            body.write(chunk)
+        body.seek(0)
+        text = io.TextIOWrapper(body, encoding="utf-8-sig", newline="")
+        reader = csv.reader(text)
+        header = next(reader, [])
+        if column not in header:
+            text.close()
+            return JSONResponse(status_code=400, content={"error": f"CSV has no {column!r} column", "response": []})
+    except Exception as e:
+        body.close()
+        log(logging.ERROR, "endpoint_failed", endpoint="/normalize_lgas/csv/", error=str(e), exc_info=True)
+        return JSONResponse(
+            status_code=500,
+            content={"error": str(e), "response": []}
+        )
+
+    value_at = header.index(column)
+    state_at = header.index(state_column) if state_column in header else None
+    normalizer = BulkNormalizer(data.gazetteer, NORMALIZE_MIN_SCORE)
+
+    def convert_next():
+        """The next NORMALIZE_CHUNK_SIZE records as (CSV text, row count), None at the end."""
+        records = list(itertools.islice(reader, NORMALIZE_CHUNK_SIZE))
+        if not records:
+            return None
+        rows = [row for row in records if row]
+        pairs = [(row[value_at] if value_at < len(row) else "",
+                  row[state_at] if state_at is not None and state_at < len(row) else None) for row in rows]
+        out = io.StringIO()
+        writer = csv.writer(out)
+        for row, match in zip(rows, normalizer.normalize(pairs)):
+            writer.writerow(row + result_fields(match))
+        return out.getvalue(), len(rows)
+
+    async def stream_rows():
+        count = 0
+        try:
+            out = io.StringIO()
+            csv.writer(out).writerow(header + list(RESULT_COLUMNS))
+            yield out.getvalue()
+            while True:
+                converted = await asyncio.to_thread(convert_next)
+                if converted is None:
+                    break
+                part, rows = converted
+                count += rows
+                yield part
+            log(logging.INFO, "lgas_normalized", rows=count, distinct=len(normalizer.matches))
+        except Exception as e:
+            # Too late for a status code: abort the response so the client sees it cut short
+            log(logging.ERROR, "endpoint_failed", endpoint="/normalize_lgas/csv/", error=str(e), rows=count,
+                exc_info=True)
+            raise
+        finally:
+            text.close()
+
+    return StreamingResponse(stream_rows(), media_type="text/csv")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,171 @@
+"""
+Prometheus metrics for the AI service, served at /metrics.
+
+Request counts, errors and latency are recorded per route by
+MetricsMiddleware; /answer/ stages, completion time per model and
+upstream token usage are recorded by the handlers; the counters the
+components already keep (answer cache, fast path, admission, breaker...)
+are read at scrape time by StatsCollector.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client import multiprocess
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+NAMESPACE = "ai_service"
+
+# Set by gunicorn.conf.py: request metrics are then summed over all workers
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+# Component counters live in each worker's memory, so they are exported per worker
+STATS_REGISTRY = CollectorRegistry()
+
+# Lookups take milliseconds, LLM answers take seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+
+REQUESTS = Counter(
+    "requests", "HTTP requests by route, method and status code",
+    ["endpoint", "method", "status"], namespace=NAMESPACE,
+)
+REQUEST_ERRORS = Counter(
+    "request_errors", "Requests that ended in a 5xx or raised",
+    ["endpoint"], namespace=NAMESPACE,
+)
+REQUEST_LATENCY = Histogram(
+    "request_duration_seconds", "Time from request to the last response byte",
+    ["endpoint"], namespace=NAMESPACE, buckets=LATENCY_BUCKETS,
+)
+ANSWER_STAGE_LATENCY = Histogram(
+    "answer_stage_duration_seconds", "Time spent in each stage of an answer",
+    ["stage"], namespace=NAMESPACE, buckets=LATENCY_BUCKETS,
+)
+MODEL_COMPLETION_LATENCY = Histogram(
+    "model_completion_duration_seconds", "Upstream completion time by model (streams: until the last token)",
+    ["model"], namespace=NAMESPACE, buckets=LATENCY_BUCKETS,
+)
+UPSTREAM_TOKENS = Counter(
+    "upstream_tokens", "Tokens reported by OpenAI, by model and kind (prompt or completion)",
+    ["model", "kind"], namespace=NAMESPACE,
+)
+
+
+@contextmanager
+def timed_stage(stage):
+    """Observe the time spent in the with-block as one answer stage."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        ANSWER_STAGE_LATENCY.labels(stage).observe(time.perf_counter() - started)
+
+
+def record_token_usage(model, usage):
+    """Count the usage block of a non-streamed completion (None is ignored)."""
+    if usage is None:
+        return
+    UPSTREAM_TOKENS.labels(model, "prompt").inc(usage.prompt_tokens or 0)
+    UPSTREAM_TOKENS.labels(model, "completion").inc(usage.completion_tokens or 0)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording count, status and latency per route.
+    Requests are labelled with the route path ("/answer/"), never the raw
+    URL, so unknown paths cannot blow up the label set. Latency runs until
+    the last body chunk, so streamed answers are timed end to end.
+    """
+
+    def __init__(self, app, routes):
+        self.app = app
+        self.routes = routes
+        self.paths = {}
+
+    def endpoint_label(self, scope):
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if endpoint not in self.paths:
+            self.paths[endpoint] = next(
+                (route.path for route in self.routes if getattr(route, "endpoint", None) is endpoint),
+                getattr(endpoint, "__name__", "unmatched"),
+            )
+        return self.paths[endpoint]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            endpoint = self.endpoint_label(scope)
+            REQUESTS.labels(endpoint, scope["method"], str(status["code"])).inc()
+            if status["code"] >= 500:
+                REQUEST_ERRORS.labels(endpoint).inc()
+            REQUEST_LATENCY.labels(endpoint).observe(time.perf_counter() - started)
+
+
+class StatsCollector:
+    """
+    Expose the numbers of a component's stats() dict at scrape time.
+    stats returns a flat dict, or {label value: flat dict} when label is set.
+    Keys listed in counters become counters (..._total), the rest gauges;
+    booleans become 0/1 and non-numeric values are skipped. Under several
+    workers each series is labelled with the pid of the worker scraped.
+    """
+
+    def __init__(self, prefix, stats, counters=(), label=None):
+        self.prefix = f"{NAMESPACE}_{prefix}"
+        self.stats = stats
+        self.counters = set(counters)
+        self.label = label
+
+    def collect(self):
+        snapshot = self.stats()
+        rows = snapshot.items() if self.label else [(None, snapshot)]
+        labels = [self.label] if self.label else []
+        extra_values = []
+        if MULTIPROCESS:
+            labels.append("pid")
+            extra_values.append(str(os.getpid()))
+        families = {}
+        for label_value, row in rows:
+            for key, value in row.items():
+                if not isinstance(value, (bool, int, float)):
+                    continue
+                if key not in families:
+                    kind = CounterMetricFamily if key in self.counters else GaugeMetricFamily
+                    families[key] = kind(f"{self.prefix}_{key}", f"{self.prefix} {key}", labels=labels)
+                values = [label_value] if self.label else []
+                families[key].add_metric(values + extra_values, float(value))
+        return list(families.values())
+
+
+def register_stats(prefix, stats, counters=(), label=None):
+    STATS_REGISTRY.register(StatsCollector(prefix, stats, counters=counters, label=label))
+
+
+def render_metrics():
+    """The current metrics in the Prometheus text format, and its content type."""
+    registry = REGISTRY
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry) + generate_latest(STATS_REGISTRY), CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead(pid):
+    """Drop the live-gauge files of a worker that exited (multiprocess mode)."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,106 @@
+"""
+Lazily loaded reference data (LGAs, partner clinics, knowledge index).
+
+Nothing is read at import time. A LazyResource builds its value once,
+in a worker thread, either from the startup warm-up or from the first
+request that needs it, so the event loop (and /health) keeps answering
+while the files are parsed. The LGA and clinic tables are served from a
+memory-mapped snapshot (see reference_snapshot.py) shared by all workers.
+"""
+import asyncio
+import logging
+import os
+import time
+
+from logs import log
+from reference_snapshot import ReferenceSnapshot, SnapshotRejected, ensure_snapshot
+
+
+def load_reference_data(lgas_path, clinics_path, snapshot_path):
+    """Map the compiled snapshot of lgas.csv and clinics.csv, compiling it first if stale."""
+    try:
+        compiled = ensure_snapshot(lgas_path, clinics_path, snapshot_path)
+    except SnapshotRejected as e:
+        # Serve the snapshot already on disk
+        log(logging.WARNING, "reference_snapshot_rejected", path=snapshot_path, version=e.version, tables=e.tables)
+        compiled = False
+    if compiled:
+        for path in (lgas_path, clinics_path):
+            if not os.path.exists(path):
+                log(logging.WARNING, "data_load_failed", dataset=path, error="file not found")
+        log(logging.INFO, "reference_snapshot_compiled", path=snapshot_path)
+    snapshot = ReferenceSnapshot(snapshot_path)
+    log(logging.INFO, "reference_snapshot_mapped", **snapshot.stats())
+    return snapshot
+
+
+class LazyResource:
+    """
+    A value built once by build() in a thread, on first get() or warm_up().
+    Concurrent callers wait on the same build.
+    """
+
+    def __init__(self, name, build):
+        self.name = name
+        self.build = build
+        self.value = None
+        self.load_seconds = None
+        self.reloads = 0
+        self._loading = None
+        self._reload_lock = asyncio.Lock()
+
+    async def _load(self):
+        started = time.perf_counter()
+        try:
+            value = await asyncio.to_thread(self.build)
+        except Exception:
+            # Let the next caller try again
+            self._loading = None
+            raise
+        self.load_seconds = round(time.perf_counter() - started, 3)
+        self.value = value
+        log(logging.INFO, "resource_loaded", resource=self.name, seconds=self.load_seconds)
+        return value
+
+    def warm_up(self):
+        """Start loading in the background if nothing has started it yet."""
+        if self._loading is None:
+            self._loading = asyncio.ensure_future(self._load())
+        return self._loading
+
+    async def get(self):
+        if self.value is not None:
+            return self.value
+        return await asyncio.shield(self.warm_up())
+
+    def set(self, value):
+        """Use value as is, without calling build()."""
+        self.value = value
+
+    async def reload(self, accept=None):
+        """
+        Build a fresh value in a thread and swap it in with one assignment.
+        Requests keep using the value they already hold, never a half-built one.
+        accept(new, old) may veto the swap; returns whether it happened.
+        """
+        if self.value is None:
+            await self.get()
+            return True
+        async with self._reload_lock:
+            started = time.perf_counter()
+            value = await asyncio.to_thread(self.build)
+            if accept is not None and not accept(value, self.value):
+                log(logging.WARNING, "resource_reload_rejected", resource=self.name)
+                return False
+            self.value = value
+            self.load_seconds = round(time.perf_counter() - started, 3)
+            self.reloads += 1
+            log(logging.INFO, "resource_reloaded", resource=self.name, seconds=self.load_seconds)
+            return True
+
+    @property
+    def ready(self):
+        return self.value is not None
+
+    def stats(self):
+        return {"ready": self.ready, "load_seconds": self.load_seconds, "reloads": self.reloads}
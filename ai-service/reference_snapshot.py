@@ -0,0 +1,456 @@
+"""
+Compiled, memory-mapped snapshot of the LGA and clinic tables.
+
+lgas.csv and clinics.csv are compiled once into a single immutable file:
+a table of interned UTF-8 strings plus fixed-width uint32 row tables,
+with clinics sorted by lower-cased LGA so a lookup is a binary search,
+a typeahead table of LGA and town names sorted by normalized name, and
+the LGA gazetteer's word index and BK-trees (see gazetteer.py).
+Workers map the file read-only and decode only the rows they return, so
+every worker on a host shares one physical copy through the page cache.
+
+    python reference_snapshot.py --lgas data/lgas.csv --clinics data/clinics.csv --out cache/reference_data.snap
+"""
+import argparse
+import csv
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from contextlib import contextmanager, nullcontext
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from gazetteer import GAZETTEER_SECTIONS, LgaGazetteer, compile_gazetteer, completion_key
+
+MAGIC = b"FPREFSN1"
+FORMAT_VERSION = 3
+ALIGN = 8
+
+LGA_COLUMNS = ("LGA", "State")
+CLINIC_COLUMNS = ("Clinic name", "LGA", "Town/City", "Address", "Popular Landmark")
+# Sections in file order; None marks the raw UTF-8 blob, the rest are uint32 arrays
+SECTIONS = (("string_offsets", 1), ("string_data", None), ("lgas", 2), ("clinics", 5), ("lga_keys", 3),
+            ("lga_completions", 4), ("town_completions", 4)) + GAZETTEER_SECTIONS
+COMPLETION_KINDS = ("lga", "town")
+
+
+class SnapshotRejected(ValueError):
+    """Compiling would empty a table the current snapshot has rows in; the current one is kept."""
+
+    def __init__(self, version, tables):
+        super().__init__(f"snapshot {version} would empty {', '.join(tables)}, keeping the current one")
+        self.version = version
+        self.tables = tables
+
+
+def source_stamp(path):
+    """(size, mtime_ns) of path, or None when it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def read_table(path, columns):
+    """Rows of path as tuples of columns ('' for missing values), and the raw bytes."""
+    if not os.path.exists(path):
+        return [], b""
+    with open(path, "rb") as f:
+        raw = f.read()
+    reader = csv.DictReader(raw.decode("utf-8-sig").splitlines())
+    return [tuple((row.get(column) or "") for column in columns) for row in reader], raw
+
+
+class _Builder:
+    def __init__(self):
+        self.ids = {}
+        self.offsets = array("I", [0])
+        self.data = bytearray()
+
+    def intern(self, text):
+        string_id = self.ids.get(text)
+        if string_id is None:
+            string_id = self.ids[text] = len(self.ids)
+            self.data += text.encode("utf-8")
+            self.offsets.append(len(self.data))
+        return string_id
+
+    def span(self, string_id):
+        """(start, end) of a string in the string data."""
+        return self.offsets[string_id], self.offsets[string_id + 1]
+
+
+def completion_rows(entries, builder):
+    """
+    Typeahead rows (key, name, lga, state) for (name, lga, state) entries.
+    Each entry is keyed by its normalized name and by every later word in
+    it ('ibadan north', 'north'), so 'nor' finds 'Ibadan North'. Whole-name
+    rows come first, then the others, each part sorted by key. Returns the
+    rows and the number of whole-name rows.
+    """
+    whole, inner = [], []
+    for name, lga, state in entries:
+        words = completion_key(name).split()
+        for position in range(len(words)):
+            (inner if position else whole).append((" ".join(words[position:]), name, lga, state))
+    rows = array("I")
+    for part in (sorted(whole), sorted(inner)):
+        for row in part:
+            rows.extend(builder.intern(value) for value in row)
+    return rows, len(whole)
+
+
+def compile_snapshot(lgas_path, clinics_path, out_path):
+    """Compile the two CSVs into out_path (written atomically); return its header."""
+    lga_rows, lgas_raw = read_table(lgas_path, LGA_COLUMNS)
+    clinic_rows, clinics_raw = read_table(clinics_path, CLINIC_COLUMNS)
+    builder = _Builder()
+
+    # One entry per (LGA, state) in first-seen order; some states have LGAs of the same name
+    lga_pairs = list(dict.fromkeys((name, state) for name, state in lga_rows if name))
+    lgas = array("I")
+    for name, state in lga_pairs:
+        lgas.extend((builder.intern(name), builder.intern(state)))
+
+    # Stable sort keeps file order within an LGA, which is the order results are shown in
+    order = sorted(range(len(clinic_rows)), key=lambda i: clinic_rows[i][1].lower())
+    clinics = array("I")
+    lga_keys = array("I")
+    previous = None
+    for position, index in enumerate(order):
+        row = clinic_rows[index]
+        clinics.extend(builder.intern(value) for value in row)
+        key = row[1].lower()
+        if key != previous:
+            lga_keys.extend((builder.intern(key), position, position + 1))
+            previous = key
+        else:
+            lga_keys[-1] = position + 1
+
+    states_of = {}
+    for name, state in lga_pairs:
+        states_of.setdefault(name.lower(), []).append(state)
+    # Clinics only name their LGA, so towns in an LGA name found in several states get no state
+    lga_state = {lga: states[0] if len(states) == 1 else "" for lga, states in states_of.items()}
+    towns = dict.fromkeys((town, lga) for _, lga, town, _, _ in clinic_rows if town.strip())
+    lga_completions, lga_whole = completion_rows(
+        ((name, name, state) for name, state in lga_pairs), builder)
+    town_completions, town_whole = completion_rows(
+        ((town, lga, lga_state.get(lga.lower(), "")) for town, lga in towns), builder)
+
+    # Interns the normalized names and words, so before the string table is written out
+    gazetteer = compile_gazetteer(lga_pairs, builder.intern, builder.span)
+
+    sections = {
+        "string_offsets": builder.offsets.tobytes(),
+        "string_data": bytes(builder.data),
+        "lgas": lgas.tobytes(),
+        "clinics": clinics.tobytes(),
+        "lga_keys": lga_keys.tobytes(),
+        "lga_completions": lga_completions.tobytes(),
+        "town_completions": town_completions.tobytes(),
+        **{name: table.tobytes() for name, table in gazetteer.items()},
+    }
+    header = {
+        "format": FORMAT_VERSION,
+        "byteorder": sys.byteorder,
+        "version": hashlib.sha1(lgas_raw + b"\0" + clinics_raw).hexdigest()[:12],
+        "compiled_at": round(time.time(), 3),
+        "sources": {"lgas": [lgas_path, source_stamp(lgas_path)],
+                    "clinics": [clinics_path, source_stamp(clinics_path)]},
+        "counts": {"strings": len(builder.ids), "lgas": len(lga_pairs),
+                   "clinics": len(clinic_rows), "lga_keys": len(lga_keys) // 3,
+                   "lga_completions": [len(lga_completions) // 4, lga_whole],
+                   "town_completions": [len(town_completions) // 4, town_whole]},
+        "sections": {},
+    }
+
+    # A CSV caught mid-write or with renamed columns must not replace good data on disk,
+    # where every worker (and any worker started later) would pick it up
+    try:
+        previous = read_header(out_path)["counts"]
+    except (OSError, ValueError, KeyError):
+        previous = {}
+    emptied = [table for table in ("lgas", "clinics") if previous.get(table) and not header["counts"][table]]
+    if emptied:
+        raise SnapshotRejected(header["version"], emptied)
+
+    # Section offsets depend on the header length, which depends on the offsets
+    while True:
+        header_bytes = json.dumps(header, sort_keys=True).encode("utf-8")
+        offset = _aligned(len(MAGIC) + 4 + len(header_bytes))
+        layout = {}
+        for name, _ in SECTIONS:
+            layout[name] = [offset, len(sections[name])]
+            offset = _aligned(offset + len(sections[name]))
+        if layout == header["sections"]:
+            break
+        header["sections"] = layout
+
+    directory = os.path.dirname(out_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(header_bytes)) + header_bytes)
+        for name, _ in SECTIONS:
+            start, _length = layout[name]
+            f.write(b"\0" * (start - f.tell()))
+            f.write(sections[name])
+    os.replace(tmp_path, out_path)
+    return header
+
+
+def _aligned(offset):
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+def parse_header(prefix, path):
+    """Header dict from the first bytes of a snapshot."""
+    if prefix[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a reference snapshot")
+    (length,) = struct.unpack("<I", prefix[len(MAGIC):len(MAGIC) + 4])
+    return json.loads(bytes(prefix[len(MAGIC) + 4:len(MAGIC) + 4 + length]))
+
+
+def read_header(path):
+    with open(path, "rb") as f:
+        prefix = f.read(len(MAGIC) + 4)
+        return parse_header(prefix + f.read(struct.unpack("<I", prefix[-4:])[0]), path)
+
+
+def rejection_path(path):
+    return f"{path}.rejected"
+
+
+def current_rejection(path, lgas_path, clinics_path):
+    """
+    {"version", "tables", "sources"} when compiling path last refused the
+    sources as they are now, else None.
+    """
+    try:
+        with open(rejection_path(path), encoding="utf-8") as f:
+            rejection = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if rejection.get("sources") != [source_stamp(lgas_path), source_stamp(clinics_path)]:
+        return None
+    return rejection
+
+
+def record_rejection(path, error, lgas_path, clinics_path):
+    tmp_path = f"{rejection_path(path)}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": error.version, "tables": error.tables,
+                   "sources": [source_stamp(lgas_path), source_stamp(clinics_path)]}, f)
+    os.replace(tmp_path, rejection_path(path))
+
+
+def is_stale(path, lgas_path, clinics_path):
+    """
+    True when path is missing, unreadable, or older than a source that
+    exists, unless those sources are exactly the ones last rejected.
+    """
+    try:
+        header = read_header(path)
+    except (OSError, ValueError):
+        return True
+    if header.get("format") != FORMAT_VERSION or header.get("byteorder") != sys.byteorder:
+        return True
+    for key, source in (("lgas", lgas_path), ("clinics", clinics_path)):
+        recorded_path, recorded_stamp = header["sources"][key]
+        stamp = source_stamp(source)
+        # A snapshot shipped without its CSVs is used as is
+        if stamp is not None and (stamp != recorded_stamp or os.path.abspath(source) != os.path.abspath(recorded_path)):
+            return current_rejection(path, lgas_path, clinics_path) is None
+    return False
+
+
+@contextmanager
+def _compile_lock(path):
+    """Exclusive lock next to path, so only one worker compiles at a time."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(f"{path}.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def ensure_snapshot(lgas_path, clinics_path, path):
+    """
+    Compile path if it is stale; return whether it was compiled. Raises
+    SnapshotRejected (keeping path, and recording the sources so they are
+    not tried again) when the new data would empty a table.
+    """
+    if not is_stale(path, lgas_path, clinics_path):
+        return False
+    with _compile_lock(path) if fcntl else nullcontext():
+        # Another worker may have compiled it while we waited
+        if not is_stale(path, lgas_path, clinics_path):
+            return False
+        try:
+            compile_snapshot(lgas_path, clinics_path, path)
+        except SnapshotRejected as e:
+            record_rejection(path, e, lgas_path, clinics_path)
+            raise
+        if os.path.exists(rejection_path(path)):
+            os.remove(rejection_path(path))
+    return True
+
+
+def needs_reload(snapshot, lgas_path, clinics_path, settle_seconds=2.0, skip_versions=()):
+    """
+    True when a source CSV changed since snapshot was compiled, or the
+    snapshot file now holds a different version (compiled by another
+    worker, or replaced by a deploy) that is not in skip_versions.
+    Sources modified in the last settle_seconds are left alone, as they
+    may still be being written.
+    """
+    now = time.time()
+    for source in (lgas_path, clinics_path):
+        stamp = source_stamp(source)
+        if stamp is not None and now - stamp[1] / 1e9 < settle_seconds:
+            return False
+    if is_stale(snapshot.path, lgas_path, clinics_path):
+        return True
+    try:
+        version = read_header(snapshot.path)["version"]
+        return version != snapshot.version and version not in skip_versions
+    except (OSError, ValueError):
+        return False
+
+
+class ReferenceSnapshot:
+    """Read-only view of a compiled snapshot; strings are decoded on access."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # From the mapping itself, in case path is replaced meanwhile
+        self.header = parse_header(self._mmap, path)
+        self.version = self.header["version"]
+        view = memoryview(self._mmap)
+        self.sections = sections = {}
+        for name, width in SECTIONS:
+            start, length = self.header["sections"][name]
+            section = view[start:start + length]
+            sections[name] = section if width is None else section.cast("I")
+        self._offsets = sections["string_offsets"]
+        self._data = sections["string_data"]
+        self._lgas = sections["lgas"]
+        self._clinics = sections["clinics"]
+        self._lga_keys = sections["lga_keys"]
+        self._completions = {kind: (sections[f"{kind}_completions"], *self.header["counts"][f"{kind}_completions"])
+                             for kind in COMPLETION_KINDS}
+        self.lga_count = self.header["counts"]["lgas"]
+        self.clinic_count = self.header["counts"]["clinics"]
+        self._key_count = self.header["counts"]["lga_keys"]
+        self.gazetteer = LgaGazetteer(self)
+
+    def string(self, string_id):
+        return str(self._data[self._offsets[string_id]:self._offsets[string_id + 1]], "utf-8")
+
+    def lga(self, index):
+        """(name, state) of LGA index."""
+        return self.string(self._lgas[2 * index]), self.string(self._lgas[2 * index + 1])
+
+    def lgas(self):
+        """(name, state) per LGA, in file order; a name may appear once per state."""
+        for i in range(self.lga_count):
+            yield self.lga(i)
+
+    def _clinic_range(self, lga):
+        """Row range of the clinics whose LGA matches lga case-insensitively."""
+        key = lga.lower()
+        low, high = 0, self._key_count
+        while low < high:
+            middle = (low + high) // 2
+            if self.string(self._lga_keys[3 * middle]) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._key_count and self.string(self._lga_keys[3 * low]) == key:
+            return self._lga_keys[3 * low + 1], self._lga_keys[3 * low + 2]
+        return 0, 0
+
+    def clinics_in(self, lga, city=None):
+        """Clinic rows (CLINIC_COLUMNS) in lga, optionally only in city, case-insensitive."""
+        city = city.lower() if city is not None else None
+        start, end = self._clinic_range(lga)
+        for row in range(start, end):
+            base = 5 * row
+            if city is not None and self.string(self._clinics[base + 2]).lower() != city:
+                continue
+            yield tuple(self.string(self._clinics[base + i]) for i in range(5))
+
+    def towns_in(self, lga):
+        """Town/City of every clinic row in lga, in file order (with duplicates)."""
+        start, end = self._clinic_range(lga)
+        for row in range(start, end):
+            yield self.string(self._clinics[5 * row + 2])
+
+    def completions(self, kind, prefix, limit):
+        """
+        Up to limit (inner, key, name, lga, state) of kind ('lga' or 'town')
+        whose normalized name, or a later word in it, starts with prefix
+        (normalized with completion_key): whole-name matches first, then by key.
+        """
+        rows, count, whole = self._completions[kind]
+        found = []
+        seen = set()
+        for start, end in ((0, whole), (whole, count)):
+            low, high = start, end
+            while low < high:
+                middle = (low + high) // 2
+                if self.string(rows[4 * middle]) < prefix:
+                    low = middle + 1
+                else:
+                    high = middle
+            for row in range(low, end):
+                if len(found) == limit:
+                    return found
+                key = self.string(rows[4 * row])
+                if not key.startswith(prefix):
+                    break
+                name, lga, state = (self.string(rows[4 * row + i]) for i in (1, 2, 3))
+                if (name, lga, state) not in seen:
+                    seen.add((name, lga, state))
+                    found.append((start != 0, key, name, lga, state))
+        return found
+
+    def stats(self):
+        return {
+            "version": self.version,
+            "compiled_at": self.header.get("compiled_at"),
+            "bytes": len(self._mmap),
+            "lgas": self.lga_count,
+            "clinics": self.clinic_count,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lgas", default="./data/lgas.csv")
+    parser.add_argument("--clinics", default="./data/clinics.csv")
+    parser.add_argument("--out", default="./cache/reference_data.snap")
+    args = parser.parse_args()
+    header = compile_snapshot(args.lgas, args.clinics, args.out)
+    print(f"{args.out}: version {header['version']}, {header['counts']}")
+
+
+if __name__ == "__main__":
+    main()
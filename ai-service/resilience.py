@@ -0,0 +1,208 @@
+import asyncio
+import time
+from collections import deque
+
+
+class UpstreamUnavailable(Exception):
+    """The upstream call was not made or did not finish in time; serve a fallback."""
+
+
+class CircuitOpenError(UpstreamUnavailable):
+    pass
+
+
+class DeadlineExceeded(UpstreamUnavailable):
+    pass
+
+
+def is_upstream_failure(error):
+    """
+    Whether an error says the upstream is unhealthy (connection error,
+    timeout, 429 or 5xx) rather than that the request itself was bad.
+    """
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    return isinstance(error, (ConnectionError, TimeoutError))
+
+
+class CircuitBreaker:
+    """
+    Closed -> open when, over the last `window` calls (and at least
+    `min_calls`), the share of failed or slow calls reaches
+    `failure_ratio`. Open short-circuits every call for `cooldown`
+    seconds, then half-open lets a single probe through: success closes
+    the circuit, failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, window=20, min_calls=10, failure_ratio=0.5, slow_call_seconds=10.0, cooldown=30.0):
+        self.outcomes = deque(maxlen=window)
+        self.min_calls = min_calls
+        self.failure_ratio = failure_ratio
+        self.slow_call_seconds = slow_call_seconds
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.trips = 0
+
+    def allow(self):
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.cooldown:
+                return False
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            if self.probe_in_flight:
+                return False
+            self.probe_in_flight = True
+        return True
+
+    def record(self, ok, seconds=0.0):
+        failed = not ok or seconds >= self.slow_call_seconds
+        if self.state == self.HALF_OPEN:
+            self.probe_in_flight = False
+            if failed:
+                self._trip()
+            else:
+                self.state = self.CLOSED
+                self.outcomes.clear()
+            return
+        self.outcomes.append(failed)
+        if (len(self.outcomes) >= self.min_calls
+                and sum(self.outcomes) / len(self.outcomes) >= self.failure_ratio):
+            self._trip()
+
+    def abandon(self):
+        """A call ended without a verdict on upstream health: free the half-open probe."""
+        if self.state == self.HALF_OPEN:
+            self.probe_in_flight = False
+
+    def _trip(self):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.outcomes.clear()
+        self.trips += 1
+
+
+class LatencyWindow:
+    """Recent call durations, for the hedging delay."""
+
+    def __init__(self, size=200):
+        self.samples = deque(maxlen=size)
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+
+    def quantile(self, q):
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class ResilientUpstream:
+    """
+    Deadline, circuit breaker and optional hedging around one upstream.
+    call(fn) runs fn() (a coroutine factory). With hedge=True and enough
+    latency history, a duplicate call starts once the first has run longer
+    than the recent `hedge_quantile` latency; the first result wins and
+    the other call is cancelled. Only errors is_failure(error) accepts
+    count against the breaker; a rejected request is not an outage.
+    """
+
+    def __init__(self, name, breaker, hedge_enabled=False, hedge_quantile=0.95,
+                 hedge_min_delay=1.0, hedge_min_samples=20, is_failure=is_upstream_failure):
+        self.name = name
+        self.breaker = breaker
+        self.is_failure = is_failure
+        self.latency = LatencyWindow()
+        self.hedge_enabled = hedge_enabled
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_min_samples = hedge_min_samples
+        self.calls = 0
+        self.failures = 0
+        self.request_errors = 0
+        self.timeouts = 0
+        self.short_circuited = 0
+        self.hedges_launched = 0
+        self.hedges_won = 0
+
+    def hedge_delay(self):
+        if len(self.latency.samples) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay, self.latency.quantile(self.hedge_quantile))
+
+    async def _hedged(self, fn):
+        delay = self.hedge_delay()
+        primary = asyncio.ensure_future(fn())
+        if delay is None:
+            return await primary
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+        self.hedges_launched += 1
+        hedge = asyncio.ensure_future(fn())
+        pending = {primary, hedge}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedges_won += 1
+                        return task.result()
+            # Both failed: surface the primary's error
+            return primary.result()
+        finally:
+            for task in (primary, hedge):
+                task.cancel()
+
+    async def call(self, fn, deadline, hedge=False):
+        if not self.breaker.allow():
+            self.short_circuited += 1
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        self.calls += 1
+        started = time.perf_counter()
+        try:
+            work = self._hedged(fn) if hedge and self.hedge_enabled else fn()
+            result = await asyncio.wait_for(work, deadline)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self.breaker.record(False)
+            raise DeadlineExceeded(f"{self.name} call exceeded {deadline}s")
+        except asyncio.CancelledError:
+            # The caller went away; this says nothing about upstream health
+            self.breaker.abandon()
+            raise
+        except Exception as e:
+            if self.is_failure(e):
+                self.failures += 1
+                self.breaker.record(False)
+            else:
+                # Bad request, auth or not found: the upstream answered
+                self.request_errors += 1
+                self.breaker.abandon()
+            raise
+        elapsed = time.perf_counter() - started
+        self.latency.add(elapsed)
+        self.breaker.record(True, elapsed)
+        return result
+
+    def stats(self):
+        return {
+            "state": self.breaker.state,
+            "trips": self.breaker.trips,
+            "calls": self.calls,
+            "failures": self.failures,
+            "request_errors": self.request_errors,
+            "timeouts": self.timeouts,
+            "short_circuited": self.short_circuited,
+            "hedges_launched": self.hedges_launched,
+            "hedges_won": self.hedges_won,
+            "p95_seconds": self.latency.quantile(0.95),
+        }
@@ -0,0 +1,169 @@
+import json
+import logging
+import math
+import os
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+from logs import log
+
+TOKEN_RE = re.compile(r"\w+")
+
+# Flowchart entries shorter than this are buttons and menu labels, not content
+MIN_PASSAGE_LENGTH = 60
+
+# Passages whose content words overlap this much (Jaccard) are the same passage
+NEAR_DUPLICATE_OVERLAP = 0.8
+
+# Function words in English, Pidgin, Yoruba, Hausa and Igbo (diacritics folded).
+# They carry no topic, and without them any question shares words with the catalog.
+STOP_WORDS = frozenset("""
+a about after again all also am an and any are as at be because been before being but by
+can could did do does doing don for from had has have having he her here hers him his how
+i if in into is it its just me more most my no nor not now of off on once only or other our
+ours out over own same she should so some such than that the their them then there these
+they this those through to too under until up very was we were what when where which while
+who whom why will with would you your yours
+abeg dey dem dis dat wetin wey una
+ati ni ti si fun o mo won awon ko se pe ba bi wa yi yii naa lati
+da ba ce cewa ko ta ya su ka ke na ne shi ita wani kuma amma ga don zan
+na nke ka ya ha anyi unu ma ga di bu
+""".split())
+
+
+def fold_text(text):
+    """Lowercase and strip diacritics so 'ọ̀gùn' and 'ogun' match."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def tokenize(text):
+    """Folded words of text, stop words left out."""
+    return [token for token in TOKEN_RE.findall(fold_text(text)) if token not in STOP_WORDS]
+
+
+class BM25Index:
+    """
+    In-memory Okapi BM25 index over short passages.
+    Postings are term -> [(doc_id, term_frequency)], so a query only
+    touches the documents that share at least one term with it.
+    """
+
+    def __init__(self, passages, k1=1.5, b=0.75):
+        self.passages = list(passages)
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(list)
+        self.doc_lengths = []
+        for doc_id, passage in enumerate(self.passages):
+            tokens = tokenize(passage)
+            self.doc_lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                self.postings[term].append((doc_id, tf))
+
+        n_docs = len(self.passages)
+        avg_length = (sum(self.doc_lengths) / n_docs) if n_docs else 0.0
+        self.idf = {
+            term: math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+        # Length normalisation does not depend on the query, so precompute it
+        self.norms = [
+            k1 * (1 - b + b * length / avg_length) if avg_length else k1
+            for length in self.doc_lengths
+        ]
+
+    def __len__(self):
+        return len(self.passages)
+
+    def search(self, query, k=3):
+        """
+        Return up to k (passage, relevance) pairs, best BM25 score first.
+        relevance in [0, 1] is the idf-weighted share of the query's words
+        found in the passage; words no passage contains weigh as much as
+        the rarest indexed word, so an off-topic question stays near 0.
+        """
+        scores = defaultdict(float)
+        matched = defaultdict(float)
+        unseen_idf = math.log(1 + (len(self.passages) + 0.5) / 0.5)
+        query_weight = 0.0
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                query_weight += unseen_idf
+                continue
+            query_weight += idf
+            for doc_id, tf in self.postings[term]:
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + self.norms[doc_id])
+                matched[doc_id] += idf
+        best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(self.passages[doc_id], round(matched[doc_id] / query_weight, 3)) for doc_id, _ in best]
+
+
+def is_menu_label(message, labels):
+    """
+    Whether a flowchart message is a button label, alone or run into its
+    translation ('I want to stop my current methodSe ìyípadà...'). Short
+    labels only count when the next word is glued on, since 'Female condom'
+    also starts content such as 'Female condoms are a barrier method...'.
+    """
+    for label in labels:
+        if message.startswith(label):
+            rest = message[len(label):]
+            if not rest or rest[0].isupper() or len(label.split()) >= 3:
+                return True
+    return False
+
+
+def load_catalog_passages(path):
+    """Content messages from the flowchart catalog (changefpm-messages-catalog.json)."""
+    with open(path, encoding="utf-8") as f:
+        catalog = json.load(f)
+    flowchart = catalog.get("flowchart_messages", {})
+    labels = {label.strip() for label in flowchart.get("buttons", []) if label.strip()}
+    messages = (m.strip() for m in flowchart.get("all", []))
+    return [m for m in messages if len(m) >= MIN_PASSAGE_LENGTH and not is_menu_label(m, labels)]
+
+
+def load_knowledge_passages(directory):
+    """Blank-line separated paragraphs from every .md/.txt file in the knowledge folder."""
+    passages = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith((".md", ".txt")) or name.lower() == "readme.md":
+            continue
+        with open(os.path.join(directory, name), encoding="utf-8") as f:
+            text = f.read()
+        passages.extend(p.strip() for p in re.split(r"\n\s*\n", text) if p.strip())
+    return passages
+
+
+def build_knowledge_index(catalog_path, knowledge_dir):
+    passages = []
+    try:
+        passages.extend(load_catalog_passages(catalog_path))
+    except Exception as e:
+        log(logging.WARNING, "data_load_failed", dataset=catalog_path, error=str(e))
+    if os.path.isdir(knowledge_dir):
+        try:
+            passages.extend(load_knowledge_passages(knowledge_dir))
+        except Exception as e:
+            log(logging.WARNING, "data_load_failed", dataset=knowledge_dir, error=str(e))
+    return BM25Index(drop_near_duplicates(passages))
+
+
+def drop_near_duplicates(passages):
+    """
+    Passages in order, leaving out any whose words mostly repeat an earlier
+    one: the catalog repeats messages with small edits, and copies would
+    fill the top k with the same text.
+    """
+    kept = []
+    kept_words = []
+    for passage in passages:
+        words = set(tokenize(passage))
+        if any(len(words & other) >= NEAR_DUPLICATE_OVERLAP * len(words | other) for other in kept_words):
+            continue
+        kept.append(passage)
+        kept_words.append(words)
+    return kept
@@ -0,0 +1,94 @@
+from answer_cache import normalize_question
+
+# Questions touching any of these stems go to the strong model
+RISK_STEMS = (
+    "bleed", "blood", "pain", "hurt", "fever", "emergenc", "abort", "miscarr", "ectopic",
+    "hiv", "infect", "allerg", "diabet", "hypertens", "pressure", "heart", "cancer",
+    "stroke", "clot", "swell", "faint", "dizz", "vomit", "missed", "late", "sick",
+    "disease", "interact", "breastfeed", "overdose", "jini", "ciwo", "irora", "egbo",
+    "obara", "mgbu",
+)
+
+# Openers of simple definition questions in the five languages
+FACTUAL_OPENERS = (
+    "what is", "what are", "how long", "how effective", "wetin", "kini", "menene",
+    "mene ne", "gini",
+)
+
+# Comparisons and choices between methods need more careful answers
+COMPARISON_WORDS = {"better", "best", "between", "versus", "vs", "compare", "difference", "which"}
+
+# Languages the cheaper model handles reliably
+FAST_MODEL_LANGUAGES = ("en", "pcm")
+
+
+class ModelRouter:
+    """
+    Score each question locally and send simple factual ones to a cheaper,
+    faster model. Higher scores mean harder or riskier questions; anything
+    at or above the threshold keeps the strong model. relevance is the
+    retrieval relevance (0 to 1) of the question's best context passage.
+    """
+
+    def __init__(self, fast_model, strong_model, threshold=0.3,
+                 min_relevance=0.5, strong_relevance=0.9, enabled=True):
+        self.fast_model = fast_model
+        self.strong_model = strong_model
+        self.threshold = threshold
+        self.min_relevance = min_relevance
+        self.strong_relevance = strong_relevance
+        self.enabled = enabled
+        self.decisions = {}
+        self.latency = {}
+
+    def score(self, question, language, relevance):
+        text = normalize_question(question)
+        tokens = text.split()
+        score = 0.0
+        if len(tokens) > 25:
+            score += 0.3
+        elif len(tokens) > 12:
+            score += 0.15
+        if question.count("?") > 1:
+            score += 0.2
+        score += min(1.0, 0.5 * sum(1 for token in tokens if token.startswith(RISK_STEMS)))
+        if COMPARISON_WORDS.intersection(tokens):
+            score += 0.2
+        if language not in FAST_MODEL_LANGUAGES:
+            score += 0.6
+        if relevance < self.min_relevance:
+            score += 0.2
+        elif relevance >= self.strong_relevance:
+            score -= 0.1
+        if text.startswith(FACTUAL_OPENERS):
+            score -= 0.2
+        return round(score, 3)
+
+    def route(self, question, language, relevance):
+        """Return (model, score) for one question."""
+        score = self.score(question, language, relevance)
+        if self.enabled and score < self.threshold:
+            model = self.fast_model
+        else:
+            model = self.strong_model
+        self.decisions[model] = self.decisions.get(model, 0) + 1
+        return model, score
+
+    def record_latency(self, model, seconds):
+        count, total, worst = self.latency.get(model, (0, 0.0, 0.0))
+        self.latency[model] = (count + 1, total + seconds, max(worst, seconds))
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "threshold": self.threshold,
+            "decisions": dict(self.decisions),
+            "latency": {
+                model: {
+                    "count": count,
+                    "avg_seconds": round(total / count, 4),
+                    "max_seconds": round(worst, 4),
+                }
+                for model, (count, total, worst) in self.latency.items()
+            },
+        }
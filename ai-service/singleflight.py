@@ -0,0 +1,33 @@
+import asyncio
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one execution.
+    The first caller for a key starts the work as a task; callers arriving
+    while it runs await the same task. The task is shielded, so a leader
+    whose client disconnects does not cancel the call for everyone else.
+    """
+
+    def __init__(self):
+        self.in_flight = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key, fn):
+        task = self.in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self.in_flight[key] = task
+            self.executions += 1
+            task.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def stats(self):
+        return {
+            "in_flight": len(self.in_flight),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+        }
@@ -25,5 +25,11 @@ if [ ! -f ".env" ]; then
 fi
 
 # Run the service
-echo "Starting FastAPI server..."
-python -m uvicorn main:app --host 0.0.0.0 --port 8000 --reload
+if [ "$1" = "--reload" ]; then
+    echo "Starting FastAPI development server with auto-reload..."
+    python -m uvicorn main:app --host 0.0.0.0 --port 8000 --reload
+else
+    # One worker per available CPU unless WORKERS is set; readiness on /ready
+    echo "Starting production server..."
+    exec gunicorn -c gunicorn.conf.py main:app
+fi
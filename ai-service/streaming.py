@@ -0,0 +1,59 @@
+import json
+
+SENTINELS = ("COMPLETE", "NO ANSWER")
+
+
+def sse_event(event, data):
+    """Format one server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class SentinelDetector:
+    """
+    Hold back the start of a streamed completion while it could still be
+    one of the special outputs, so the client never renders a partial
+    'COMPLETE' or 'NO ANSWER' as if it were a real answer.
+    """
+
+    def __init__(self, sentinels=SENTINELS):
+        self.sentinels = sentinels
+        self.buffer = ""
+        self.decided = False
+        self.sentinel = None
+
+    def feed(self, token):
+        """
+        Return the text that is safe to forward now ('' while undecided).
+        A sentinel only counts once a word boundary or the end of the stream
+        follows it, so 'COMPLETE' + 'LY safe' is forwarded as an answer.
+        """
+        if self.decided:
+            return token
+        self.buffer += token
+        head = self.buffer.lstrip()
+        for sentinel in self.sentinels:
+            if head.startswith(sentinel):
+                rest = head[len(sentinel):]
+                if not rest:
+                    return ""
+                if not (rest[0].isalnum() or rest[0] == "_"):
+                    self.decided = True
+                    self.sentinel = sentinel
+                    self.buffer = ""
+                    return ""
+        if not head or any(s.startswith(head) for s in self.sentinels):
+            return ""
+        self.decided = True
+        flushed, self.buffer = head, ""
+        return flushed
+
+    def flush(self):
+        """Release whatever is still held when the stream ends ('' for a sentinel)."""
+        if self.decided:
+            return ""
+        self.decided = True
+        flushed, self.buffer = self.buffer.strip(), ""
+        if flushed in self.sentinels:
+            self.sentinel = flushed
+            return ""
+        return flushed
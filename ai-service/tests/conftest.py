@@ -0,0 +1,57 @@
+import os
+import sys
+
+import pytest
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+# main builds its OpenAI client lazily; nothing under test reaches it
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+LGAS = [
+    ("Ikeja", "Lagos"),
+    ("Alimosho", "Lagos"),
+    ("Lagos Island", "Lagos"),
+    ("Eti-Osa", "Lagos"),
+    ("Nasarawa", "Kano"),
+    ("Kano Municipal", "Kano"),
+    ("Nasarawa", "Nasarawa"),
+    ("Lafia", "Nasarawa"),
+    ("Aba North", "Abia"),
+    ("Aba South", "Abia"),
+    ("Ọ̀yọ́ East", "Oyo"),
+]
+CLINICS = [
+    ("Ikeja Clinic", "Ikeja", "Ikeja GRA", "1 Allen Avenue", "Near the mall"),
+    ("Oregun Clinic", "Ikeja", "Oregun", "2 Oregun Road", ""),
+    ("Second GRA Clinic", "ikeja", "Ikeja GRA", "3 Isaac John Street", ""),
+    ("Aba Clinic", "Aba South", "Aba", "4 Asa Road", ""),
+]
+
+
+def write_csv(path, header, rows):
+    import csv
+
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+    return str(path)
+
+
+@pytest.fixture
+def data_files(tmp_path):
+    """(lgas.csv, clinics.csv, snapshot path) with the rows above."""
+    lgas = write_csv(tmp_path / "lgas.csv", ("LGA", "State"), LGAS)
+    clinics = write_csv(tmp_path / "clinics.csv",
+                        ("Clinic name", "LGA", "Town/City", "Address", "Popular Landmark"), CLINICS)
+    return lgas, clinics, str(tmp_path / "reference_data.snap")
+
+
+@pytest.fixture
+def snapshot(data_files):
+    from reference_snapshot import ReferenceSnapshot, compile_snapshot
+
+    lgas, clinics, path = data_files
+    compile_snapshot(lgas, clinics, path)
+    return ReferenceSnapshot(path)
@@ -0,0 +1,36 @@
+import asyncio
+import json
+
+from fastapi.responses import JSONResponse
+
+import main
+from admission import AdmissionGate, admission_controlled
+
+
+def full_gate():
+    """A gate whose only slot is taken and that queues nothing."""
+    gate = AdmissionGate("test", max_in_flight=1, max_queue=0, queue_timeout=0.1, retry_after=7)
+    asyncio.run(gate.acquire())
+    return gate
+
+
+async def handler(request):
+    return JSONResponse(content={"response": "answered"})
+
+
+def test_refused_requests_get_retry_after():
+    response = asyncio.run(admission_controlled(full_gate())(handler)(main.GPTRequest(memory={})))
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "7"
+
+
+def test_degraded_answers_are_plain_200s():
+    request = main.GPTRequest(memory={})
+    response = asyncio.run(admission_controlled(full_gate(), on_reject=main.degraded_answer)(handler)(request))
+    assert response.status_code == 200
+    assert "Retry-After" not in response.headers
+    assert json.loads(response.body) == {"response": main.DEGRADED_MESSAGE, "degraded": True}
+
+    response = asyncio.run(admission_controlled(full_gate(), on_reject=main.degraded_answer_stream)(handler)(request))
+    assert response.status_code == 200
+    assert "Retry-After" not in response.headers
@@ -0,0 +1,86 @@
+import random
+
+import Levenshtein
+import pytest
+
+from conftest import write_csv
+from gazetteer import clean_text, completion_key, similarity, state_key
+from reference_snapshot import ReferenceSnapshot, compile_snapshot
+
+STATES = ("Lagos", "Kano", "Oyo", "Abia", "Rivers")
+
+
+def test_normalization():
+    assert clean_text("Ọ̀yọ́ (East)") == "oyo east"
+    assert completion_key("  Eti-Osa  ") == "eti osa"
+    assert completion_key("Ɗanbatta") == "danbatta"
+    assert state_key("Akwa-Ibom State") == "akwa ibom"
+    assert similarity(0, "", "") == 1.0
+    assert similarity(1, "ikeja", "ikja") == 0.8
+
+
+def test_exact_and_whole_word_matches_score_one(snapshot):
+    gazetteer = snapshot.gazetteer
+    assert gazetteer.closest("IKEJA", n=1) == [("Ikeja", "Lagos", 1.0)]
+    assert gazetteer.closest("oyo east", n=1) == [("Ọ̀yọ́ East", "Oyo", 1.0)]
+    top = gazetteer.closest("aba", n=3)
+    assert [name for name, _, _ in top[:2]] == ["Aba North", "Aba South"]
+    assert [score for _, _, score in top[:2]] == [1.0, 1.0]
+
+
+def test_results_are_sorted_by_score(snapshot):
+    for query in ("ikeja", "lagos islnd", "nasarwa", "abaa", "zzz"):
+        scores = [score for _, _, score in snapshot.gazetteer.closest(query, n=5)]
+        assert scores == sorted(scores, reverse=True)
+
+
+def test_state_partition_finds_names_shared_with_other_states(snapshot):
+    gazetteer = snapshot.gazetteer
+    assert gazetteer.closest("Nasarawa", n=1, state="Kano") == [("Nasarawa", "Kano", 1.0)]
+    assert gazetteer.closest("Nasarawa", n=1, state="nasarawa state") == [("Nasarawa", "Nasarawa", 1.0)]
+    assert {state for _, state, _ in gazetteer.closest("ikeja", n=5, state="Kano")} == {"Kano"}
+    assert gazetteer.has_state("LAGOS STATE")
+    assert not gazetteer.has_state("Nowhere")
+    assert gazetteer.closest("ikeja", state="Nowhere") == []
+
+
+def brute_force(lgas, query, n, state=None):
+    """closest() by comparing query with every LGA name."""
+    query = completion_key(query)
+    pool = [i for i, (_, s) in enumerate(lgas) if state is None or state_key(s) == state_key(state)]
+    words = {i: clean_text(lgas[i][0]) for i in pool}
+    exact = [i for i in pool if query in words[i].split()]
+    nearest = sorted((Levenshtein.distance(words[i], query), i) for i in pool if i not in exact)
+    candidates = [(Levenshtein.distance(words[i], query), i) for i in exact]
+    candidates += nearest[:max(0, n - len(exact))]
+
+    def score(distance, i):
+        return max([similarity(distance, words[i], query)] +
+                   [similarity(Levenshtein.distance(w, query), w, query) for w in words[i].split()])
+    return [lgas[i] for _, _, i in sorted((-score(d, i), d, i) for d, i in candidates)]
+
+
+@pytest.fixture(scope="module")
+def generated(tmp_path_factory):
+    rng = random.Random(7)
+    syllables = ("ka", "no", "ba", "ike", "ja", "osa", "la", "fi", "ogu", "mu", "zi", "ri", "ver", "ada")
+    names = set()
+    while len(names) < 400:
+        words = ["".join(rng.choice(syllables) for _ in range(rng.randint(1, 3))).title()
+                 for _ in range(rng.randint(1, 2))]
+        names.add(" ".join(words))
+    lgas = [(name, rng.choice(STATES)) for name in sorted(names)]
+    directory = tmp_path_factory.mktemp("generated")
+    path = str(directory / "snap")
+    compile_snapshot(write_csv(directory / "lgas.csv", ("LGA", "State"), lgas), str(directory / "none.csv"), path)
+    return lgas, ReferenceSnapshot(path), rng
+
+
+def test_bk_tree_matches_brute_force(generated):
+    lgas, snapshot, rng = generated
+    for _ in range(200):
+        name, state = rng.choice(lgas)
+        query = "".join(c for c in name if rng.random() > 0.15) + rng.choice(("", "a", "x"))
+        scope = rng.choice((None, state, rng.choice(STATES)))
+        found = snapshot.gazetteer.closest(query, n=5, state=scope)
+        assert [(name, state) for name, state, _ in found] == brute_force(lgas, query, 5, scope), (query, scope)
@@ -0,0 +1,34 @@
+from lga_normalizer import BulkNormalizer, match_key, match_keys, result_fields
+
+
+def test_match_key_normalizes_value_and_state():
+    assert match_key("  IKEJA ", "Lagos State") == ("ikeja", "lagos")
+    assert match_key("Ikeja") == ("ikeja", "")
+
+
+def test_bulk_normalizer_matches_each_distinct_key_once(snapshot):
+    normalizer = BulkNormalizer(snapshot.gazetteer, min_score=0.5)
+    rows = [("ikeja", None), ("IKEJA ", None), ("Nasarawa", "Kano"), ("Nasarawa", "Kano State"), ("", None)]
+    results = normalizer.normalize(rows)
+    assert results[0] == results[1] == ("Ikeja", "Lagos", 1.0)
+    assert results[2] == results[3] == ("Nasarawa", "Kano", 1.0)
+    assert results[4] is None
+    assert len(normalizer.matches) == 3
+
+
+def test_bulk_normalizer_leaves_weak_matches_unmatched(snapshot):
+    assert BulkNormalizer(snapshot.gazetteer, min_score=0.5).normalize([("zzz", None)]) == [None]
+    assert BulkNormalizer(snapshot.gazetteer).normalize([("zzz", None)])[0] is not None
+    assert result_fields(None) == ["", "", ""]
+
+
+def test_bulk_normalizer_ignores_unknown_states(snapshot):
+    assert BulkNormalizer(snapshot.gazetteer).normalize([("ikeja", "Atlantis")]) == [("Ikeja", "Lagos", 1.0)]
+
+
+def test_match_keys_in_a_pool_agrees_with_one_process(snapshot):
+    keys = [match_key(value) for value in ("ikeja", "alimoso", "aba", "lafia", "zzz", "eti osa")]
+    alone = match_keys(snapshot.path, keys, workers=1, min_score=0.5)
+    pooled = match_keys(snapshot.path, keys, workers=2, min_score=0.5, chunk_size=2)
+    assert pooled == alone
+    assert alone[match_key("zzz")] is None
@@ -0,0 +1,110 @@
+import csv
+import io
+import socket
+import threading
+import time
+
+import httpx
+import pytest
+import uvicorn
+from fastapi.testclient import TestClient
+
+import main
+from reference_data import LazyResource
+
+VALUES = ["Ikeja", "ikja", "Aba South", "Nasarawa", "", "Lagos Island", "nowhere at all", "Ọ̀yọ́ East"]
+
+
+@pytest.fixture
+def service(snapshot, monkeypatch):
+    data = LazyResource("reference_data", lambda: snapshot)
+    data.set(snapshot)
+    monkeypatch.setattr(main, "reference_data", data)
+    monkeypatch.setattr(main, "NORMALIZE_CHUNK_SIZE", 7)
+    return main.app
+
+
+@pytest.fixture
+def client(service):
+    return TestClient(service)
+
+
+@pytest.fixture
+def server(service):
+    """Base URL of the app under uvicorn, which (unlike TestClient) races the body against disconnects."""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(service, host="127.0.0.1", port=port, lifespan="off", log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    yield f"http://127.0.0.1:{port}"
+    server.should_exit = True
+    thread.join(5)
+
+
+def upload(rows):
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(("id", "selected_lga", "note"))
+    writer.writerows(rows)
+    return out.getvalue().encode("utf-8")
+
+
+def test_csv_uploaded_in_chunks_comes_back_whole(server):
+    rows = [(str(i), VALUES[i % len(VALUES)], "two\nlines" if i % 9 == 0 else "") for i in range(200)]
+    body = upload(rows)
+
+    def chunks():
+        # Splits records, quoted fields and multi-byte characters alike
+        for start in range(0, len(body), 97):
+            time.sleep(0.001)
+            yield body[start:start + 97]
+
+    response = httpx.post(f"{server}/normalize_lgas/csv/", content=chunks(), timeout=10)
+    assert response.status_code == 200
+    returned = list(csv.reader(io.StringIO(response.text)))
+    assert returned[0] == ["id", "selected_lga", "note", "lga_match", "state_match", "score"]
+    assert [row[:3] for row in returned[1:]] == [list(row) for row in rows]
+    assert returned[1][3:] == ["Ikeja", "Lagos", "1.0"]
+    assert returned[5][3:] == ["", "", ""]
+
+
+def test_csv_without_the_column_is_a_400(client):
+    response = client.post("/normalize_lgas/csv/?column=lga", content=upload([("1", "Ikeja", "")]))
+    assert response.status_code == 400
+    assert "lga" in response.json()["error"]
+
+
+def test_csv_without_lga_data_is_not_read(data_files, monkeypatch):
+    from reference_snapshot import ReferenceSnapshot, compile_snapshot
+
+    _, clinics, path = data_files
+    compile_snapshot("missing.csv", clinics, path)
+    data = LazyResource("reference_data", None)
+    data.set(ReferenceSnapshot(path))
+    monkeypatch.setattr(main, "reference_data", data)
+    response = TestClient(main.app).post("/normalize_lgas/csv/", content=upload([("1", "Ikeja", "")]))
+    assert response.json() == {"response": [], "message": "LGA data not available"}
+
+
+def test_json_batch_is_matched_in_chunks(client, monkeypatch):
+    batches = []
+    normalize = main.BulkNormalizer.normalize
+
+    def recorded(self, rows):
+        batches.append(len(rows))
+        return normalize(self, rows)
+
+    monkeypatch.setattr(main.BulkNormalizer, "normalize", recorded)
+    values = [VALUES[i % len(VALUES)] for i in range(50)] + [{"value": "Nasarawa", "state": "Nasarawa"}]
+    response = client.post("/normalize_lgas/", json={"values": values})
+    assert response.status_code == 200
+    result = response.json()["response"]
+    assert [item["input"] for item in result] == values[:-1] + ["Nasarawa"]
+    assert result[0] == {"input": "Ikeja", "lga": "Ikeja", "state": "Lagos", "score": 1.0}
+    assert result[-1] == {"input": "Nasarawa", "lga": "Nasarawa", "state": "Nasarawa", "score": 1.0}
+    assert response.json()["distinct"] == len(set(VALUES)) + 1
+    assert batches == [7] * 7 + [2]
@@ -0,0 +1,107 @@
+import os
+import time
+
+import pytest
+
+from conftest import write_csv
+from reference_snapshot import (
+    ReferenceSnapshot,
+    SnapshotRejected,
+    compile_snapshot,
+    current_rejection,
+    ensure_snapshot,
+    is_stale,
+    needs_reload,
+    read_header,
+)
+
+
+def test_round_trips_rows_and_interns_strings(snapshot):
+    assert snapshot.lga_count == 11
+    assert snapshot.clinic_count == 4
+    assert list(snapshot.lgas())[:2] == [("Ikeja", "Lagos"), ("Alimosho", "Lagos")]
+    # Repeated values ("Lagos", "Ikeja") are one string each
+    strings = [snapshot.string(i) for i in range(snapshot.header["counts"]["strings"])]
+    assert len(strings) == len(set(strings))
+    assert strings.count("Lagos") == 1
+
+
+def test_keeps_lgas_of_the_same_name_in_each_state(snapshot):
+    assert ("Nasarawa", "Kano") in snapshot.lgas()
+    assert ("Nasarawa", "Nasarawa") in snapshot.lgas()
+
+
+def test_clinics_in_is_case_insensitive_and_keeps_file_order(snapshot):
+    assert [row[0] for row in snapshot.clinics_in("IKEJA")] == ["Ikeja Clinic", "Oregun Clinic", "Second GRA Clinic"]
+    assert [row[0] for row in snapshot.clinics_in("ikeja", "ikeja gra")] == ["Ikeja Clinic", "Second GRA Clinic"]
+    assert list(snapshot.clinics_in("Nowhere")) == []
+    assert list(snapshot.towns_in("Ikeja")) == ["Ikeja GRA", "Oregun", "Ikeja GRA"]
+
+
+def test_completions_put_whole_names_before_inner_words(snapshot):
+    found = snapshot.completions("lga", "aba", 10)
+    assert [(inner, name) for inner, _, name, _, _ in found] == [(False, "Aba North"), (False, "Aba South")]
+    found = snapshot.completions("lga", "sou", 10)
+    assert [(inner, name) for inner, _, name, _, _ in found] == [(True, "Aba South")]
+    assert [state for *_, state in snapshot.completions("lga", "nasa", 10)] == ["Kano", "Nasarawa"]
+    assert snapshot.completions("town", "ore", 10)[0][2:4] == ("Oregun", "Ikeja")
+
+
+def test_version_follows_the_data(data_files, tmp_path):
+    lgas, clinics, path = data_files
+    first = compile_snapshot(lgas, clinics, path)["version"]
+    assert compile_snapshot(lgas, clinics, str(tmp_path / "other.snap"))["version"] == first
+    write_csv(lgas, ("LGA", "State"), [("Ikeja", "Lagos")])
+    assert compile_snapshot(lgas, clinics, path)["version"] != first
+
+
+def test_ensure_snapshot_compiles_only_when_stale(data_files):
+    lgas, clinics, path = data_files
+    assert ensure_snapshot(lgas, clinics, path)
+    assert not ensure_snapshot(lgas, clinics, path)
+    stamp = os.stat(lgas).st_mtime + 5
+    os.utime(lgas, (stamp, stamp))
+    assert is_stale(path, lgas, clinics)
+    assert ensure_snapshot(lgas, clinics, path)
+
+
+def test_rejects_data_that_would_empty_a_table(data_files):
+    lgas, clinics, path = data_files
+    ensure_snapshot(lgas, clinics, path)
+    good = read_header(path)
+    write_csv(clinics, ("Clinic name", "LGA", "Town/City", "Address", "Popular Landmark"), [])
+    old = time.time() - 10
+    os.utime(clinics, (old, old))
+
+    with pytest.raises(SnapshotRejected) as rejected:
+        ensure_snapshot(lgas, clinics, path)
+    assert rejected.value.tables == ["clinics"]
+    # The good snapshot is still on disk and the rejection is remembered
+    assert read_header(path)["version"] == good["version"]
+    assert current_rejection(path, lgas, clinics)["version"] == rejected.value.version
+    assert not is_stale(path, lgas, clinics)
+    assert not ensure_snapshot(lgas, clinics, path)
+    assert not needs_reload(ReferenceSnapshot(path), lgas, clinics)
+
+    # Fixed data is compiled again and clears the rejection
+    write_csv(clinics, ("Clinic name", "LGA", "Town/City", "Address", "Popular Landmark"),
+              [("Ikeja Clinic", "Ikeja", "Ikeja GRA", "1 Allen Avenue", "")])
+    os.utime(clinics, (old + 5, old + 5))
+    assert ensure_snapshot(lgas, clinics, path)
+    assert current_rejection(path, lgas, clinics) is None
+    assert read_header(path)["counts"]["clinics"] == 1
+
+
+def test_empty_first_snapshot_is_not_rejected(tmp_path):
+    path = str(tmp_path / "empty.snap")
+    assert ensure_snapshot(str(tmp_path / "missing.csv"), str(tmp_path / "missing.csv"), path)
+    assert ReferenceSnapshot(path).lga_count == 0
+
+
+def test_needs_reload_skips_versions_already_refused(snapshot, data_files):
+    lgas, clinics, path = data_files
+    # Another worker compiles a new version under the one this worker serves
+    write_csv(lgas, ("LGA", "State"), [("Ikeja", "Lagos")])
+    other = compile_snapshot(lgas, clinics, path)
+    assert needs_reload(snapshot, lgas, clinics, settle_seconds=0)
+    assert not needs_reload(snapshot, lgas, clinics, settle_seconds=0, skip_versions={other["version"]})
@@ -0,0 +1,75 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+import main
+from conftest import write_csv
+from reference_data import LazyResource, load_reference_data
+from reference_snapshot import ReferenceSnapshot, compile_snapshot
+
+
+@pytest.fixture
+def service_data(data_files, monkeypatch):
+    """Point main at the test CSVs with a fresh reference_data resource."""
+    lgas, clinics, path = data_files
+    settle(lgas)
+    settle(clinics)
+    monkeypatch.setattr(main, "LGAS_PATH", lgas)
+    monkeypatch.setattr(main, "CLINICS_PATH", clinics)
+    monkeypatch.setattr(main, "REFERENCE_SNAPSHOT_PATH", path)
+    monkeypatch.setattr(main, "rejected_versions", set())
+    monkeypatch.setattr(main, "reference_data",
+                        LazyResource("reference_data", lambda: load_reference_data(lgas, clinics, path)))
+    return data_files
+
+
+def settle(path):
+    old = time.time() - 10
+    os.utime(path, (old, old))
+
+
+def test_reload_swaps_in_new_data(service_data):
+    lgas, _, _ = service_data
+
+    async def scenario():
+        first = await main.reference_data.get()
+        write_csv(lgas, ("LGA", "State"), [("Ikeja", "Lagos")])
+        settle(lgas)
+        assert main.needs_reload(first, lgas, main.CLINICS_PATH)
+        return first, await main.reload_reference_data("test")
+
+    first, (swapped, previous, current) = asyncio.run(scenario())
+    assert swapped and previous is first
+    assert current.lga_count == 1 and current.version != first.version
+
+
+def test_reload_that_would_empty_a_table_keeps_the_current_data(service_data):
+    lgas, clinics, path = service_data
+
+    async def scenario():
+        first = await main.reference_data.get()
+        write_csv(clinics, ("Clinic name", "LGA", "Town/City", "Address", "Popular Landmark"), [])
+        settle(clinics)
+        result = await main.reload_reference_data("test")
+        # The watcher does not try the same CSVs again
+        return first, result, main.needs_reload(main.reference_data.value, lgas, clinics)
+
+    first, (swapped, previous, current), again = asyncio.run(scenario())
+    assert not swapped
+    assert current is first and current.clinic_count == 4
+    assert not again
+    # A worker started now maps the good snapshot too
+    assert load_reference_data(lgas, clinics, path).version == first.version
+
+
+def test_keep_non_empty_refuses_a_snapshot_that_empties_a_table(service_data, tmp_path):
+    lgas, clinics, path = service_data
+    good = load_reference_data(lgas, clinics, path)
+    compile_snapshot(lgas, str(tmp_path / "missing.csv"), str(tmp_path / "empty.snap"))
+    empty = ReferenceSnapshot(str(tmp_path / "empty.snap"))
+    assert main.keep_non_empty(good, empty)
+    assert not main.keep_non_empty(empty, good)
+    # Remembered so the watcher skips a snapshot replaced by hand with this version
+    assert main.rejected_versions == {empty.version}
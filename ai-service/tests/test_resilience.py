@@ -0,0 +1,126 @@
+import asyncio
+
+import openai
+import pytest
+
+from llm import is_openai_failure
+from resilience import CircuitBreaker, CircuitOpenError, DeadlineExceeded, ResilientUpstream
+
+
+def test_breaker_opens_on_failure_ratio_and_probes_after_cooldown(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("resilience.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker(window=4, min_calls=4, failure_ratio=0.5, cooldown=30)
+    for ok in (True, False, True):
+        breaker.record(ok)
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record(False)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    now[0] += 31
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # One probe at a time
+    assert not breaker.allow()
+    breaker.record(False)
+    assert breaker.state == CircuitBreaker.OPEN and breaker.trips == 2
+
+    now[0] += 31
+    assert breaker.allow()
+    breaker.record(True)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_slow_calls_count_as_failures():
+    breaker = CircuitBreaker(window=2, min_calls=2, failure_ratio=1.0, slow_call_seconds=1.0)
+    breaker.record(True, 5.0)
+    breaker.record(True, 5.0)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def upstream(**kwargs):
+    return ResilientUpstream("test", CircuitBreaker(window=2, min_calls=2, failure_ratio=1.0, **kwargs))
+
+
+def test_deadline_counts_against_the_breaker():
+    async def slow():
+        await asyncio.sleep(1)
+
+    target = upstream()
+    for _ in range(2):
+        with pytest.raises(DeadlineExceeded):
+            asyncio.run(target.call(slow, deadline=0.01))
+    assert target.breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(target.call(slow, deadline=0.01))
+    assert target.stats()["short_circuited"] == 1
+
+
+def test_connection_errors_count_against_the_breaker():
+    async def broken():
+        raise ConnectionError("reset")
+
+    target = upstream()
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            asyncio.run(target.call(broken, deadline=1))
+    assert target.breaker.state == CircuitBreaker.OPEN
+
+
+def status_error(cls, status):
+    import httpx
+
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    return cls("upstream said no", response=httpx.Response(status, request=request), body=None)
+
+
+@pytest.mark.parametrize("error", [
+    lambda: status_error(openai.BadRequestError, 400),
+    lambda: status_error(openai.AuthenticationError, 401),
+    lambda: status_error(openai.NotFoundError, 404),
+])
+def test_request_errors_leave_the_breaker_alone(error):
+    async def rejected():
+        raise error()
+
+    target = ResilientUpstream("openai", CircuitBreaker(window=2, min_calls=2, failure_ratio=1.0),
+                               is_failure=is_openai_failure)
+    for _ in range(3):
+        with pytest.raises(openai.APIStatusError):
+            asyncio.run(target.call(rejected, deadline=1))
+    assert target.breaker.state == CircuitBreaker.CLOSED
+    assert target.stats()["failures"] == 0 and target.stats()["request_errors"] == 3
+
+
+@pytest.mark.parametrize("error", [
+    lambda: status_error(openai.RateLimitError, 429),
+    lambda: status_error(openai.InternalServerError, 503),
+    lambda: openai.APITimeoutError(request=None),
+])
+def test_outages_count_against_the_breaker(error):
+    async def failing():
+        raise error()
+
+    target = ResilientUpstream("openai", CircuitBreaker(window=2, min_calls=2, failure_ratio=1.0),
+                               is_failure=is_openai_failure)
+    for _ in range(2):
+        with pytest.raises(openai.APIError):
+            asyncio.run(target.call(failing, deadline=1))
+    assert target.breaker.state == CircuitBreaker.OPEN
+
+
+def test_request_error_frees_the_half_open_probe(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("resilience.time.monotonic", lambda: now[0])
+
+    async def rejected():
+        raise ValueError("bad request")
+
+    target = upstream(cooldown=30)
+    target.breaker._trip()
+    now[0] += 31
+    with pytest.raises(ValueError):
+        asyncio.run(target.call(rejected, deadline=1))
+    assert target.breaker.state == CircuitBreaker.HALF_OPEN
+    assert target.breaker.allow()
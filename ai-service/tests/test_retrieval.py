@@ -0,0 +1,67 @@
+import json
+import os
+
+import pytest
+
+from retrieval import BM25Index, build_knowledge_index, drop_near_duplicates, is_menu_label, load_catalog_passages, tokenize
+
+CATALOG = os.path.join(os.path.dirname(__file__), "..", "..", "changefpm-messages-catalog.json")
+
+PASSAGES = [
+    "Jadelle is a contraceptive implant of two small rods placed under the skin of the upper arm.",
+    "Postinor is an emergency contraceptive pill taken within 72 hours of unprotected sex.",
+    "Female condoms are a barrier method of contraception worn inside the vagina.",
+]
+
+
+def test_tokenize_drops_stop_words():
+    assert tokenize("What is the capital of France?") == ["capital", "france"]
+    assert tokenize("Wetin dey happen for my body") == ["happen", "body"]
+
+
+def test_relevance_is_the_share_of_the_question_found():
+    index = BM25Index(PASSAGES)
+    passage, relevance = index.search("what is postinor", k=1)[0]
+    assert passage.startswith("Postinor") and relevance == 1.0
+    assert index.search("what is the capital of france") == []
+    # One word found, one no passage has
+    _, relevance = index.search("is the implant painful", k=1)[0]
+    assert 0 < relevance < 0.5
+
+
+def test_menu_labels_are_recognised():
+    labels = {"I want to stop my current method", "Female condom", "Calendar method"}
+    assert is_menu_label("I want to stop my current methodSe ìyípadà tàbí ìdádúró", labels)
+    assert is_menu_label("I want to stop my current method Ina so in canza", labels)
+    assert is_menu_label("Calendar methodHanyar kalanda", labels)
+    assert not is_menu_label("Female condoms are a barrier method of contraception.", labels)
+    assert not is_menu_label("Calendar method works by avoiding sex on fertile days.", labels)
+
+
+def test_catalog_passages_skip_menu_labels(tmp_path):
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps({"flowchart_messages": {
+        "buttons": ["Effect of method on sex life"],
+        "all": ["Effect of method on sex lifeTasirin hanya akan rayuwar jima'i, da sauransu",
+                "Short",
+                PASSAGES[0]],
+    }}), encoding="utf-8")
+    assert load_catalog_passages(path) == [PASSAGES[0]]
+
+
+def test_near_duplicates_keep_the_first():
+    edited = PASSAGES[1].replace("72 hours", "72 hours (3 days)")
+    assert drop_near_duplicates([PASSAGES[1], PASSAGES[0], edited, PASSAGES[1]]) == [PASSAGES[1], PASSAGES[0]]
+
+
+@pytest.mark.skipif(not os.path.exists(CATALOG), reason="message catalog not checked out")
+def test_catalog_off_topic_questions_fall_below_threshold():
+    from config import RETRIEVAL_MIN_RELEVANCE
+
+    index = build_knowledge_index(CATALOG, "missing")
+    for question in ("how do I fix my car", "what is the capital of france", "what colour is the sky"):
+        assert all(relevance < RETRIEVAL_MIN_RELEVANCE for _, relevance in index.search(question))
+    for question in ("what is jadelle", "how effective is postinor", "does the implant cause weight gain"):
+        assert index.search(question)[0][1] >= RETRIEVAL_MIN_RELEVANCE
+    passages = [passage for passage, _ in index.search("what is postinor", k=5)]
+    assert len(passages) == len(drop_near_duplicates(passages))
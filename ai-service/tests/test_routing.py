@@ -0,0 +1,18 @@
+from routing import ModelRouter
+
+
+def router():
+    return ModelRouter("fast", "strong", threshold=0.3, min_relevance=0.5, strong_relevance=0.9)
+
+
+def test_relevance_moves_the_score_within_its_range():
+    question = "how do I use a female condom"
+    base = router().score(question, "en", 0.7)
+    assert router().score(question, "en", 0.2) == round(base + 0.2, 3)
+    assert router().score(question, "en", 0.95) == round(base - 0.1, 3)
+
+
+def test_weak_retrieval_keeps_the_strong_model():
+    question = "can I start using the implant straight away if I am not sure when my last period was"
+    assert router().route(question, "en", 0.95)[0] == "fast"
+    assert router().route(question, "en", 0.2)[0] == "strong"
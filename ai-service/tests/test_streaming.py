@@ -0,0 +1,34 @@
+from streaming import SentinelDetector
+
+
+def run(tokens):
+    """(forwarded text, sentinel) for a stream of tokens."""
+    detector = SentinelDetector()
+    text = "".join(detector.feed(token) for token in tokens) + detector.flush()
+    return text, detector.sentinel
+
+
+def test_sentinel_prefix_of_a_word_is_an_answer():
+    assert run(["COMPLETE", "LY", " safe"]) == ("COMPLETELY safe", None)
+    assert run(["NO", " ANSWER", "S", " here"]) == ("NO ANSWERS here", None)
+
+
+def test_sentinel_waits_for_a_word_boundary():
+    detector = SentinelDetector()
+    assert detector.feed("COMPLETE") == ""
+    assert detector.sentinel is None
+    assert detector.feed(".") == ""
+    assert detector.sentinel == "COMPLETE"
+
+
+def test_sentinel_at_the_end_of_the_stream():
+    assert run(["  NO", " ANS", "WER"]) == ("", "NO ANSWER")
+    assert run(["COMPLETE", "\n"]) == ("", "COMPLETE")
+
+
+def test_answers_are_forwarded_as_soon_as_they_differ():
+    detector = SentinelDetector()
+    assert detector.feed(" CO") == ""
+    assert detector.feed("uld") == "COuld"
+    assert detector.feed(" be") == " be"
+    assert run(["No", ", it is safe"]) == ("No, it is safe", None)
@@ -1,16 +1,18 @@
-import openai
-from config import OPENAI_API_KEY
+import logging
 
-openai.api_key = OPENAI_API_KEY
+from config import CONTEXT_TIMEOUT, CONTEXT_DEADLINE
+from llm import get_client, openai_upstream
+from logs import log
+from metrics import record_token_usage
 
 
-async def get_context_with_openai(query: str) -> str:
+async def get_context_with_openai(query: str, timeout: float = CONTEXT_TIMEOUT) -> str:
     """
     Get context for the user's question using OpenAI.
     This can be used to retrieve relevant family planning information.
     """
     try:
-        response = openai.ChatCompletion.create(
+        response = await openai_upstream.call(lambda: get_client().chat.completions.create(
             model="gpt-3.5-turbo",
             messages=[
                 {
@@ -23,9 +25,11 @@ async def get_context_with_openai(query: str) -> str:
                 }
             ],
             temperature=0.3,
-            max_tokens=200
-        )
+            max_tokens=200,
+            timeout=timeout
+        ), deadline=CONTEXT_DEADLINE)
+        record_token_usage("gpt-3.5-turbo", response.usage)
         return response.choices[0].message.content.strip()
     except Exception as e:
-        print(f"Error getting context: {e}")
+        log(logging.ERROR, "context_failed", error=str(e))
         return "General family planning information available."